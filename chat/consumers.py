@@ -8,8 +8,53 @@ Notes for the marker/reviewer:
 
 """
 
+import asyncio
 import json
+import logging
+import time
+from collections import deque
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from core.notifications import notification_group
+from core.pagination import InvalidCursor
+from .history import fetch_history, message_buffer, serialize_message
+
+logger = logging.getLogger(__name__)
+
+# --- Class `TokenBucket`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class TokenBucket:
+    """Allow `rate` events per second on average, with bursts of up to `burst`."""
+    # --- Def `__init__`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    # --- Def `consume`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def consume(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
 
 # --- Class `ChatConsumer`: High-level intent
 
@@ -18,28 +63,175 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
 class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    Room chat. Clients send `{"message": ...}` to post and
+    `{"type": "load_older", "before": <cursor>}` to page back through history.
+    The server sends `{"type": "messages", "messages": [...]}` for live
+    messages and `{"type": "history", "messages": [...], "before": <cursor or
+    null>}` for the backfill on connect and for every "load older" request.
+
+    Live messages are serialized once by the sender and coalesced per socket:
+    everything that arrives within `batch_window` seconds (or `batch_size`
+    messages) goes out as one frame. A socket that cannot keep up holds at
+    most `outbox_limit` messages; older ones are dropped, and it is
+    disconnected if it drops another `outbox_limit` before catching up. Each connection
+    may send `rate_limit` messages per second, in bursts of `rate_burst`.
+    """
+    batch_window = 0.05
+    batch_size = 50
+    outbox_limit = 500
+    rate_limit = 5
+    rate_burst = 10
+
     async def connect(self):
         self.room_name = self.scope['url_route']['kwargs']['room_name']
         self.room_group_name = f'chat_{self.room_name}'
+        self.outbox = deque()
+        self.dropped = 0
+        self.flush_timer = None
+        self.flush_task = None
+        self.throttle = TokenBucket(self.rate_limit, self.rate_burst)
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        await self.send_history()
 
     async def disconnect(self, close_code):
+        self.cancel_flush()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data=None, bytes_data=None):
         if not text_data:
             return
+        if not self.throttle.consume():
+            await self.send(text_data=json.dumps({'type': 'error', 'error': 'Rate limit exceeded'}))
+            return
         data = json.loads(text_data)
+        if data.get('type') == 'load_older':
+            await self.send_history(data.get('before'))
+            return
         message = data.get('message', '')
-        username = self.scope['user'].username
+        if not message:
+            return
+        user = self.scope['user']
+        entry = message_buffer.add(
+            room=self.room_name,
+            user=user if user.is_authenticated else None,
+            username=user.username,
+            message=message,
+        )
+        # Serialized here, once, instead of once per receiving socket.
         await self.channel_layer.group_send(
             self.room_group_name,
-            {'type': 'chat_message', 'message': message, 'username': username}
+            {'type': 'chat_message', 'payload': json.dumps(serialize_message(entry))}
         )
 
     async def chat_message(self, event):
+        if len(self.outbox) >= self.outbox_limit:
+            self.outbox.popleft()
+            self.dropped += 1
+            if self.dropped > self.outbox_limit:
+                logger.info('Disconnecting slow chat consumer %s', self.channel_name)
+                self.cancel_flush()
+                await self.close(code=4008)
+                return
+        self.outbox.append(event['payload'])
+        if len(self.outbox) >= self.batch_size:
+            self.start_flush()
+        elif self.flush_timer is None:
+            self.flush_timer = asyncio.get_running_loop().call_later(self.batch_window, self.start_flush)
+
+    # --- Def `start_flush`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def start_flush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        # A flush already in progress picks up whatever was queued meanwhile.
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_outbox())
+
+    # --- Def `flush_outbox`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    async def flush_outbox(self):
+        try:
+            while self.outbox:
+                batch = [self.outbox.popleft() for _ in range(min(self.batch_size, len(self.outbox)))]
+                await self.send(text_data='{"type": "messages", "messages": [%s]}' % ', '.join(batch))
+            # The socket caught up; only sustained lag leads to a disconnect.
+            self.dropped = 0
+        except Exception:
+            logger.exception('Could not deliver chat messages to %s', self.channel_name)
+
+    # --- Def `cancel_flush`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def cancel_flush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+
+    # --- Def `send_history`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    async def send_history(self, before=None):
+        # Make this process's buffered messages visible before reading them back.
+        await message_buffer.flush()
+        try:
+            messages, older = await database_sync_to_async(fetch_history)(self.room_name, before)
+        except InvalidCursor:
+            await self.send(text_data=json.dumps({'type': 'error', 'error': 'Invalid cursor'}))
+            return
+        await self.send(text_data=json.dumps({'type': 'history', 'messages': messages, 'before': older}))
+
+# --- Class `NotificationConsumer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes a user's notifications as they are created.
+
+    The unread count is read once on connect and then kept in memory from
+    the pushed events, so the badge stays current without page reloads or
+    queries. Frames: `{"type": "unread", "count": n}` and
+    `{"type": "notification", "notification": {...}, "unread": n}`.
+    """
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = notification_group(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        self.unread = await database_sync_to_async(
+            lambda: type(user).objects.values_list('unread_notifications', flat=True).get(pk=user.pk)
+        )()
+        await self.send_unread()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notification_created(self, event):
+        self.unread += 1
         await self.send(text_data=json.dumps({
-            'message': event['message'],
-            'username': event['username']
+            'type': 'notification', 'notification': event['notification'], 'unread': self.unread,
         }))
+
+    async def notification_read(self, event):
+        self.unread = 0 if event.get('all') else max(self.unread - len(event['ids']), 0)
+        await self.send_unread()
+
+    # --- Def `send_unread`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    async def send_unread(self):
+        await self.send(text_data=json.dumps({'type': 'unread', 'count': self.unread}))
@@ -9,7 +9,7 @@ Notes for the marker/reviewer:
 """
 
 from django.contrib import admin
-from .models import User, Course, Enrollment, Feedback, StatusUpdate, Notification, CourseMaterial
+from .models import User, Course, Enrollment, Feedback, StatusUpdate, Notification, CourseMaterial, Job
 from django.contrib.admin import TabularInline
 
 # --- Class `CourseMaterialInline`: High-level intent
@@ -43,6 +43,16 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('student', 'course', 'enrolled_at', 'is_blocked')
     list_filter = ('course', 'is_blocked')
 
+# --- Class `JobAdmin`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+
 admin.site.register(User)
 admin.site.register(Course, CourseAdmin)
 admin.site.register(Enrollment, EnrollmentAdmin)
@@ -50,3 +60,4 @@ admin.site.register(Feedback)
 admin.site.register(StatusUpdate)
 admin.site.register(Notification)
 admin.site.register(CourseMaterial)
+admin.site.register(Job, JobAdmin)
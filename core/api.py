@@ -10,14 +10,221 @@ Notes for the marker/reviewer:
 
 # core/api.py
 
-from rest_framework import viewsets, permissions, filters, exceptions
+import codecs
+import csv
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import viewsets, permissions, filters, exceptions, generics, mixins, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from .models import User, Course, Enrollment, Feedback, StatusUpdate
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from . import catalogue, rosters, search, sync, uploads
+from .models import User, Course, Enrollment, Feedback, StatusUpdate, UploadSession
+from .pagination import InvalidCursor
 from .serializers import (
-    UserSerializer, CourseSerializer, EnrollmentSerializer,
-    FeedbackSerializer, StatusUpdateSerializer
+    BulkBlockSerializer, UserSerializer, CourseSerializer, EnrollmentSerializer,
+    FeedbackSerializer, StatusUpdateSerializer, SearchResultSerializer, CourseMaterialSerializer,
+    UploadSessionSerializer, get_values_plan, plan_queryset, request_field_spec,
 )
 
+# Queryset optimization
+# --- Class `QueryPlanMixin`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class QueryPlanMixin:
+    """
+    Apply the serializer's `select_related` / `prefetch_related` plan to the queryset.
+
+    The plan is derived from the nested fields of `serializer_class` and the
+    request's `?fields=` / `?expand=` / `?collapse=` selection (see `get_query_plan`), so
+    rendering a page of objects costs a fixed number of queries instead of
+    one or more per row, and unselected relations cost none. Reads also
+    defer the columns nobody renders. Actions listed in `unplanned_actions`
+    never serialize a related object and keep the bare queryset.
+    """
+    unplanned_actions = ('destroy',)
+
+    # --- Def `get_queryset`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.unplanned_actions:
+            return queryset
+        return plan_queryset(
+            queryset, self.get_serializer_class(), request_field_spec(self.request),
+            trim=self.request.method in permissions.SAFE_METHODS, always_load=self.get_always_loaded_fields(),
+        )
+
+    # --- Def `get_always_loaded_fields`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_always_loaded_fields(self):
+        """Fields the view reads itself, whatever is rendered; here the cursor sort key."""
+        return tuple(name.lstrip('-') for name in getattr(self, 'cursor_ordering', ()))
+
+# Read-only list fast path
+# --- Class `ValuesListMixin`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class ValuesListMixin:
+    """
+    Render `list` pages straight from `.values()` rows when the serializer
+    allows it (see `get_values_plan`), skipping model instances and DRF's
+    per-field serialization; the output is identical. Serializers that need
+    instances, e.g. for to-many relations, take the regular path.
+    """
+
+    # --- Def `list`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def list(self, request, *args, **kwargs):
+        plan = get_values_plan(self.get_serializer_class(), request_field_spec(request))
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        rows = queryset.values(*dict.fromkeys((*plan.lookups, *self.get_always_loaded_fields())))
+        page = self.paginate_queryset(rows)
+        data = [plan.build(row) for row in (rows if page is None else page)]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+# Conditional GET
+# --- Class `ConditionalGetMixin`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class ConditionalGetMixin:
+    """
+    Send `ETag` / `Last-Modified` validators with `list` and `retrieve`, and
+    answer a matching `If-None-Match` / `If-Modified-Since` with
+    `304 Not Modified` before anything is serialized.
+
+    A page of a collection is validated by the count and latest `updated_at`
+    of the filtered queryset plus the request URL (one aggregate query);
+    deleting a row changes the count, adding or editing one moves the maximum.
+    An object is validated by its own `updated_at`. Rows embedded in the
+    payload through a foreign key (e.g. the author) count too when their
+    `updated_at` lookups are listed in `related_modified_fields`. Rows
+    embedded as a list (e.g. a course's materials) are also listed in
+    `related_count_fields`, so that removing one changes the validators;
+    objects are then validated with one aggregate query as well.
+    """
+    modified_field = 'updated_at'
+    related_modified_fields = ()
+    related_count_fields = ()
+
+    # --- Def `get_always_loaded_fields`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_always_loaded_fields(self):
+        return (*super().get_always_loaded_fields(), self.modified_field)
+
+    # --- Def `get_list_validators`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_list_validators(self, request):
+        """Return `(etag, last_modified)` for the requested page; either may be `None`."""
+        counts, last_modified = self.summarize(self.filter_queryset(self.get_queryset()))
+        etag = make_etag(request.build_absolute_uri(), *counts, last_modified)
+        return etag, last_modified
+
+    # --- Def `summarize`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def summarize(self, queryset):
+        """
+        `(counts, last_modified)` of `queryset` in one aggregate: its row count
+        and those of `related_count_fields`, and the latest modification time.
+        """
+        fields = (self.modified_field, *self.related_modified_fields)
+        # Joined lists repeat each row, so rows are then counted once each.
+        summary = queryset.order_by().aggregate(
+            count=Count('pk', distinct=bool(self.related_count_fields)),
+            **{f'count_{number}': Count(field, distinct=True) for number, field in enumerate(self.related_count_fields)},
+            **{f'modified_{number}': Max(field) for number, field in enumerate(fields)},
+        )
+        counts = [summary.pop(key) for key in ('count', *(f'count_{n}' for n in range(len(self.related_count_fields))))]
+        return counts, max(filter(None, summary.values()), default=None)
+
+    # --- Def `get_object_validators`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_object_validators(self, request, instance):
+        if self.related_count_fields:
+            counts, last_modified = self.summarize(type(instance)._default_manager.filter(pk=instance.pk))
+            return make_etag(instance._meta.label, instance.pk, *counts, last_modified), last_modified
+        fields = (self.modified_field, *self.related_modified_fields)
+        last_modified = max(filter(None, (_follow(instance, field) for field in fields)), default=None)
+        return make_etag(instance._meta.label, instance.pk, last_modified), last_modified
+
+    # --- Def `list`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators(request)
+        return conditional_response(
+            request, etag, last_modified, lambda: self.list_response(request, *args, **kwargs),
+        )
+
+    # --- Def `list_response`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def list_response(self, request, *args, **kwargs):
+        """The full response for a `list` that was not answered with a 304."""
+        return super().list(request, *args, **kwargs)
+
+    # --- Def `retrieve`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(request, instance)
+        return conditional_response(
+            request, etag, last_modified, lambda: Response(self.get_serializer(instance).data),
+        )
+
+# --- Def `_follow`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def _follow(instance, lookup):
+    """The value at a `a__b` lookup path from `instance`, or `None` past a missing relation."""
+    for name in lookup.split('__'):
+        if instance is None:
+            return None
+        instance = getattr(instance, name)
+    return instance
+
+# --- Def `make_etag`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def make_etag(*parts):
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return quote_etag(digest)
+
+# --- Def `conditional_response`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def conditional_response(request, etag, last_modified, build):
+    """
+    Return a 304 (or 412) when the request's preconditions say the client's
+    copy is current; otherwise call `build()` and stamp the validators on it.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+    if etag:
+        response.headers['ETag'] = etag
+    if timestamp is not None:
+        response.headers['Last-Modified'] = http_date(timestamp)
+    return response
+
 # Custom Permissions
 # --- Class `IsTeacher`: High-level intent
 # This class contributes to the domain model or view/controller layer.
@@ -82,22 +289,44 @@ class IsEnrolledStudent(permissions.BasePermission):
         # Allow other actions (like list or retrieve) for any student.
         return True
 
+# --- Class `FullTextSearchFilter`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    `SearchFilter` answered from the full-text index instead of `icontains`
+    scans over `search_fields`. Words match on their prefix, so the view's
+    documented search fields are those indexed by `core.search`.
+    """
+    # --- Def `filter_queryset`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        pks = search.matching_pks(queryset.model, query)
+        if pks is None:
+            return queryset
+        return queryset.filter(pk__in=pks)
+
 # ViewSets
 # --- Class `UserViewSet`: High-level intent
 # This class contributes to the domain model or view/controller layer.
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(ValuesListMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     """
     A read-only API endpoint for viewing Users.
     
     Provides `list` and `retrieve` actions.
-    Supports searching by `username`, `first_name`, and `last_name`.
+    Supports searching by `username`, `first_name`, and `last_name` through
+    the full-text index.
+    Lists are cursor-paginated in `id` order.
     Access is restricted to authenticated users.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    cursor_ordering = ('id',)
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
     search_fields = ['username', 'first_name', 'last_name']
 
 # --- Class `CourseViewSet`: High-level intent
@@ -106,7 +335,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalGetMixin, ValuesListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     A full CRUD API endpoint for managing Courses.
     
@@ -117,6 +346,11 @@ class CourseViewSet(viewsets.ModelViewSet):
     """
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
+    cursor_ordering = ('-created_at', '-id')
+    unplanned_actions = ('destroy', 'import_enrollments', 'block_enrollments')
+    # Each item embeds its teacher, materials and stats.
+    related_modified_fields = ('teacher__updated_at', 'stats__updated_at', 'course_materials__updated_at')
+    related_count_fields = ('course_materials',)
 
     # --- Def `get_permissions`: High-level intent
 
@@ -129,7 +363,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         Dynamically set permissions based on the requested action.
         Write actions are restricted to teachers.
         """
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'import_enrollments', 'block_enrollments']:
             self.permission_classes = [IsTeacher]
         else:
             self.permission_classes = [IsAuthenticated]
@@ -147,13 +381,93 @@ class CourseViewSet(viewsets.ModelViewSet):
         """
         serializer.save(teacher=self.request.user)
 
+    # --- Def `get_list_validators`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_list_validators(self, request):
+        etag, last_modified = super().get_list_validators(request)
+        # Cached pages are keyed on it too (see list_response).
+        self.list_etag = etag
+        return etag, last_modified
+
+    # --- Def `list_response`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def list_response(self, request, *args, **kwargs):
+        """
+        Serve catalogue pages from the read-through cache (core/catalogue.py),
+        keyed on the full URL and the page's ETag; `X-Cache` says whether this
+        one was a hit. The catalogue version only follows this process's
+        writes, the ETag also those of workers and other servers.
+        """
+        data, hit = catalogue.read_through(
+            f'api:{request.build_absolute_uri()}:{self.list_etag}',
+            lambda: super(CourseViewSet, self).list_response(request, *args, **kwargs).data,
+        )
+        return Response(data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+
+    # --- Def `get_owned_course`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_owned_course(self):
+        course = self.get_object()
+        if course.teacher_id != self.request.user.pk:
+            raise exceptions.PermissionDenied('Only the course teacher can manage its enrollments.')
+        return course
+
+    # --- Def `import_enrollments`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @action(detail=True, methods=['post'], url_path='enrollments/import')
+    def import_enrollments(self, request, pk=None):
+        """
+        Enroll the students of an uploaded CSV roster (`file`, with a
+        `username` and an optional `is_blocked` column; see core/rosters.py).
+        """
+        course = self.get_owned_course()
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise exceptions.ValidationError({'file': 'Upload the roster as a CSV file.'})
+        try:
+            result = rosters.import_roster(course, codecs.iterdecode(upload, 'utf-8-sig'))
+        except (rosters.RosterError, UnicodeDecodeError, csv.Error) as exc:
+            raise exceptions.ValidationError({'file': f'{exc} Rows before it were imported.'})
+        return Response(result._asdict())
+
+    # --- Def `block_enrollments`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @action(detail=True, methods=['post'], url_path='enrollments/block')
+    def block_enrollments(self, request, pk=None):
+        """Block (`"blocked": true`) or unblock many enrolled `students` by id."""
+        course = self.get_owned_course()
+        serializer = BulkBlockSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changed = rosters.set_blocked(course, serializer.validated_data['students'], serializer.validated_data['blocked'])
+        return Response({'changed': changed})
+
 # --- Class `EnrollmentViewSet`: High-level intent
 
 # This class contributes to the domain model or view/controller layer.
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(ValuesListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing course Enrollments.
     
@@ -162,6 +476,7 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     """
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
+    cursor_ordering = ('-enrolled_at', '-id')
     permission_classes = [IsStudent]
 
     # --- Def `perform_create`: High-level intent
@@ -170,19 +485,42 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
 
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
         Set the student for the enrollment to the currently logged-in user.
         """
         serializer.save(student=self.request.user)
 
+    # --- Def `perform_update`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Atomic, so the course stats changed by core/signals.py commit with the row."""
+        super().perform_update(serializer)
+
+    # --- Def `perform_destroy`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Atomic, so the course stats changed by core/signals.py commit with the row."""
+        super().perform_destroy(instance)
+
 # --- Class `FeedbackViewSet`: High-level intent
 
 # This class contributes to the domain model or view/controller layer.
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(ConditionalGetMixin, ValuesListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing course Feedback.
     
@@ -192,6 +530,9 @@ class FeedbackViewSet(viewsets.ModelViewSet):
     """
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
+    cursor_ordering = ('-created_at', '-id')
+    # Each item embeds its author.
+    related_modified_fields = ('student__updated_at',)
     permission_classes = [permissions.IsAuthenticated, IsEnrolledStudent]
 
     # --- Def `perform_create`: High-level intent
@@ -200,19 +541,42 @@ class FeedbackViewSet(viewsets.ModelViewSet):
 
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
         Set the student for the feedback to the currently logged-in user.
         """
         serializer.save(student=self.request.user)
 
+    # --- Def `perform_update`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Atomic, so the course stats changed by core/signals.py commit with the row."""
+        super().perform_update(serializer)
+
+    # --- Def `perform_destroy`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Atomic, so the course stats changed by core/signals.py commit with the row."""
+        super().perform_destroy(instance)
+
 # --- Class `StatusUpdateViewSet`: High-level intent
 
 # This class contributes to the domain model or view/controller layer.
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class StatusUpdateViewSet(viewsets.ModelViewSet):
+class StatusUpdateViewSet(ConditionalGetMixin, ValuesListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     API endpoint for users to post and view Status Updates.
     
@@ -221,6 +585,9 @@ class StatusUpdateViewSet(viewsets.ModelViewSet):
     """
     queryset = StatusUpdate.objects.order_by('-created_at')
     serializer_class = StatusUpdateSerializer
+    cursor_ordering = ('-created_at', '-id')
+    # Each item embeds its author.
+    related_modified_fields = ('user__updated_at',)
     permission_classes = [IsAuthenticated]
 
     # --- Def `perform_create`: High-level intent
@@ -234,3 +601,178 @@ class StatusUpdateViewSet(viewsets.ModelViewSet):
         Set the user for the status update to the currently logged-in user.
         """
         serializer.save(user=self.request.user)
+
+# --- Class `SearchAPIView`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SearchAPIView(generics.GenericAPIView):
+    """
+    Ranked full-text search across users, courses and feedback comments.
+
+    - `q`: the search text; every word must match, the last as a prefix.
+    - `type`: optional, repeatable filter (`user`, `course`, `feedback`).
+    - `cursor` / `page_size`: pages follow the ranking; use the `next` link.
+    """
+    serializer_class = SearchResultSerializer
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    # --- Def `get`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get(self, request):
+        kinds = request.query_params.getlist('type')
+        unknown = set(kinds) - set(search.KINDS)
+        if unknown:
+            raise exceptions.ValidationError({'type': f"Unknown type(s): {', '.join(sorted(unknown))}"})
+        try:
+            page_size = min(int(request.query_params.get('page_size', self.page_size)), self.max_page_size)
+        except ValueError:
+            page_size = self.page_size
+        try:
+            page = search.search(
+                request.query_params.get('q', ''), kinds=kinds,
+                cursor=request.query_params.get('cursor'), page_size=max(page_size, 1),
+            )
+        except InvalidCursor:
+            raise exceptions.NotFound('Invalid cursor')
+        next_url = None
+        if page.next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', page.next_cursor)
+        return Response({
+            'next': next_url,
+            'results': self.get_serializer(page.object_list, many=True).data,
+        })
+
+# --- Class `SyncTokenGone`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class SyncTokenGone(exceptions.APIException):
+    status_code = 410
+    default_detail = 'Sync token expired; download the data again and restart from a fresh token.'
+    default_code = 'gone'
+
+# --- Class `SyncAPIView`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SyncAPIView(generics.GenericAPIView):
+    """
+    Changes to courses, materials, enrollments, feedback and notifications
+    visible to the caller since a sync token (see core/sync.py).
+
+    - no `since`: an empty change list and a token for the current position.
+    - `since`: up to `SYNC_PAGE_SIZE` changes after the token, each with the
+      row's current data or as a `delete` tombstone; call again with `next`
+      while `more` is true. An expired token answers 410 Gone.
+    """
+    permission_classes = [IsAuthenticated]
+
+    # --- Def `get`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get(self, request):
+        try:
+            return Response(sync.changes_since(request, request.query_params.get('since') or None))
+        except InvalidCursor:
+            raise exceptions.ValidationError({'since': 'Invalid sync token.'})
+        except sync.SyncTokenExpired:
+            raise SyncTokenGone()
+
+# --- Class `UploadViewSet`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class UploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                    viewsets.GenericViewSet):
+    """
+    Resumable, chunked uploads of course materials (see core/uploads.py).
+
+    - `POST` opens an upload for `course`, `filename` and `size`.
+    - `PUT <id>/?offset=<n>` appends the raw request body at byte `n`; a
+      wrong offset answers 409 with the expected `received`.
+    - `GET <id>/` reports `received`, where an interrupted upload resumes.
+    - `POST <id>/finalize/` with the file's `sha256` creates the material.
+    - `DELETE <id>/` abandons the upload.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsTeacher]
+
+    # --- Def `get_queryset`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+
+    # --- Def `perform_create`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.instance = uploads.start(data['course'], self.request.user, data['filename'], data['size'])
+
+    # --- Def `update`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def update(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            offset = int(request.query_params['offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            raise exceptions.ValidationError({'offset': 'Give the byte offset of the chunk.'})
+        try:
+            uploads.write_chunk(session, offset, request.stream, length)
+        except uploads.UploadConflict as exc:
+            return Response({'detail': str(exc), 'received': exc.offset}, status=status.HTTP_409_CONFLICT)
+        except uploads.UploadError as exc:
+            raise exceptions.ValidationError({'detail': str(exc)})
+        return Response(self.get_serializer(session).data)
+
+    # --- Def `perform_destroy`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def perform_destroy(self, instance):
+        uploads.abort(instance)
+
+    # --- Def `finalize`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        try:
+            material = uploads.finish(session, str(request.data.get('sha256', '')))
+        except uploads.UploadError as exc:
+            raise exceptions.ValidationError({'sha256': str(exc)})
+        serializer = CourseMaterialSerializer(material, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
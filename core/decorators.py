@@ -9,8 +9,9 @@ Notes for the marker/reviewer:
 """
 
 from functools import wraps
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
 from django.core.exceptions import PermissionDenied
+from .identity import get_object_or_404
 from .models import Course, User
 
 # --- Def `teacher_required`: High-level intent
@@ -59,8 +60,8 @@ def teacher_is_course_owner(view_func):
     # This function contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     def _wrapped_view(request, *args, **kwargs):
-        course = get_object_or_404(Course, pk=kwargs['pk'])
-        if not request.user.is_authenticated or request.user != course.teacher:
+        course = get_object_or_404(request, Course, pk=kwargs['pk'])
+        if not request.user.is_authenticated or request.user.pk != course.teacher_id:
             raise PermissionDenied
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -78,8 +79,8 @@ def teacher_is_course_owner_by_id(view_func):
     # This function contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     def _wrapped_view(request, *args, **kwargs):
-        course = get_object_or_404(Course, pk=kwargs['course_id'])
-        if not request.user.is_authenticated or request.user != course.teacher:
+        course = get_object_or_404(request, Course, pk=kwargs['course_id'])
+        if not request.user.is_authenticated or request.user.pk != course.teacher_id:
             raise PermissionDenied
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -96,7 +97,7 @@ def user_is_owner(view_func):
     # This function contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     def _wrapped_view(request, *args, **kwargs):
-        profile_user = get_object_or_404(User, username=kwargs.get('username'))
+        profile_user = get_object_or_404(request, User, username=kwargs.get('username'))
         if not request.user.is_authenticated or request.user != profile_user:
             raise PermissionDenied
         return view_func(request, *args, **kwargs)
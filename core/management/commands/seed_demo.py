@@ -10,6 +10,7 @@ Notes for the marker/reviewer:
 
 from django.core.management.base import BaseCommand
 from core.models import User, Course, Enrollment, CourseMaterial
+from core import course_stats, search
 from faker import Faker
 import random
 
@@ -74,4 +75,9 @@ class Command(BaseCommand):
                     file=f'course_materials/dummy_file_{course.id}_{i}.pdf'
                 )
 
+        # bulk_create skips the signals that maintain the search index and
+        # create each course's stats row.
+        search.rebuild_index()
+        course_stats.repair()
+
         self.stdout.write(self.style.SUCCESS('Successfully seeded the database.'))
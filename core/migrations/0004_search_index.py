@@ -0,0 +1,26 @@
+# Full-text search index for core.search (SQLite FTS5).
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_job_queue'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE core_search USING fts5("
+                "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+                "INSERT INTO core_search (rowid, title, body) "
+                "SELECT (id << 2) | 1, username, trim(first_name || ' ' || last_name) FROM core_user",
+                "INSERT INTO core_search (rowid, title, body) "
+                "SELECT (id << 2) | 2, title, description FROM core_course",
+                "INSERT INTO core_search (rowid, title, body) "
+                "SELECT (id << 2) | 3, '', comment FROM core_feedback",
+            ],
+            reverse_sql=['DROP TABLE core_search'],
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.13 on 2026-10-17 14:01
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def populate_stats(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    CourseStats = apps.get_model('core', 'CourseStats')
+    Enrollment = apps.get_model('core', 'Enrollment')
+    Feedback = apps.get_model('core', 'Feedback')
+    stats = {pk: CourseStats(course_id=pk) for pk in Course.objects.values_list('pk', flat=True)}
+    enrollments = Enrollment.objects.values('course_id').order_by().annotate(
+        enrolled_count=Count('pk'), active_count=Count('pk', filter=Q(is_blocked=False)),
+    )
+    feedback = Feedback.objects.values('course_id').order_by().annotate(
+        rating_count=Count('pk'), rating_total=Sum('rating'),
+        **{f'rating_{n}': Count('pk', filter=Q(rating=n)) for n in range(1, 6)},
+    )
+    for rows in (enrollments, feedback):
+        for row in rows:
+            row_stats = stats[row.pop('course_id')]
+            for field, value in row.items():
+                setattr(row_stats, field, value)
+    CourseStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.course')),
+                ('enrolled_count', models.PositiveIntegerField(default=0)),
+                ('active_count', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_total', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
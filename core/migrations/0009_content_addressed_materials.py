@@ -0,0 +1,45 @@
+# Generated by Django 4.2.13 on 2026-10-17 14:39
+
+import core.storage
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_file_names(apps, schema_editor):
+    # Existing files still carry their uploaded name; `collect_blobs --adopt`
+    # moves them into the blob storage.
+    CourseMaterial = apps.get_model('core', 'CourseMaterial')
+    for material in CourseMaterial.objects.filter(name='').only('file').iterator():
+        material.name = material.file.name.split('/')[-1][:255]
+        material.save(update_fields=['name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_changelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('stored_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='coursematerial',
+            name='file',
+            field=models.FileField(storage=core.storage.ContentAddressedStorage(), upload_to='course_materials/'),
+        ),
+        migrations.RunPython(copy_file_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-17 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursematerial',
+            name='previews',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-17 15:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_date_joined(apps, schema_editor):
+    # The best available estimate for users that predate the column.
+    apps.get_model('core', 'User').objects.update(updated_at=F('date_joined'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_date_joined, migrations.RunPython.noop),
+    ]
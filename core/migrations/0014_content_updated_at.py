@@ -0,0 +1,30 @@
+# Generated by Django 4.2.13 on 2026-10-17 15:43
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_uploaded_at(apps, schema_editor):
+    # Existing stats rows keep the migration time, which is as good as any.
+    apps.get_model('core', 'CourseMaterial').objects.update(updated_at=F('uploaded_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_notificationfanout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursematerial',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_uploaded_at, migrations.RunPython.noop),
+    ]
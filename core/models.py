@@ -8,9 +8,14 @@ Notes for the marker/reviewer:
 
 """
 
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+from .storage import material_storage
 
 # --- Class `User`: High-level intent
 
@@ -22,6 +27,16 @@ class User(AbstractUser):
     ROLE_CHOICES = (('student', 'Student'), ('teacher', 'Teacher'))
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     photo = models.ImageField(upload_to='user_photos/', null=True, blank=True)
+    # Resized copies of `photo`, recorded by the `generate_derivatives` job
+    # (core/thumbnails.py).
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Denormalized count of unread notifications, maintained by
+    # core.notifications, so the navbar badge costs no query.
+    unread_notifications = models.PositiveIntegerField(default=0, editable=False)
+    # Feedback and status updates embed their author, so their ETags
+    # (core/api.py) also follow the author's changes. Logins save
+    # `last_login` alone and leave it as it is.
+    updated_at = models.DateTimeField(auto_now=True)
     
     @property
     # --- Def `real_name`: High-level intent
@@ -41,6 +56,13 @@ class Course(models.Model):
     description = models.TextField()
     teacher = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # --- Class `Meta`: High-level intent
+    # This class contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='course_created_id_idx')]
 
     # --- Def `__str__`: High-level intent
 
@@ -59,8 +81,31 @@ class Course(models.Model):
 
 class CourseMaterial(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='course_materials')
-    file = models.FileField(upload_to='course_materials/')
+    # Stored once per distinct content (core/storage.py); `name` keeps the
+    # uploaded file name, which the blob's name no longer carries.
+    file = models.FileField(upload_to='course_materials/', storage=material_storage)
+    name = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Course ETags follow it (core/api.py), e.g. when previews are generated.
+    updated_at = models.DateTimeField(auto_now=True)
+    # First-page previews of images and PDFs (core/thumbnails.py).
+    previews = models.JSONField(default=dict, blank=True, editable=False)
+
+    @property
+    # --- Def `filename`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def filename(self):
+        return self.name or self.file.name.split('/')[-1]
+
+    # --- Def `save`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def save(self, *args, **kwargs):
+        # Until the field commits the upload, `file.name` is the name it was uploaded as.
+        if not self.name and self.file:
+            self.name = self.file.name.split('/')[-1][:255]
+        super().save(*args, **kwargs)
 
     # --- Def `__str__`: High-level intent
 
@@ -69,7 +114,58 @@ class CourseMaterial(models.Model):
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
     def __str__(self):
-        return f'{self.file.name.split("/")[-1]} for {self.course.title}'
+        return f'{self.filename} for {self.course.title}'
+
+# --- Class `Blob`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class Blob(models.Model):
+    """
+    One stored file of `material_storage`, named after the SHA-256 `digest`
+    of its content. `ref_count` counts the materials using it (core/blobs.py);
+    `stored_at` is the last time an upload stored or reused it.
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    stored_at = models.DateTimeField(default=timezone.now)
+
+    # --- Def `__str__`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def __str__(self):
+        return f'{self.digest[:12]} ({self.ref_count} references)'
+
+# --- Class `UploadSession`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload of a course material (core/uploads.py).
+    `received` is how many leading bytes of the declared `size` are on disk;
+    the next chunk must start there.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # --- Def `__str__`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def __str__(self):
+        return f'{self.filename} ({self.received}/{self.size} bytes)'
 
 # --- Class `Enrollment`: High-level intent
 
@@ -87,6 +183,7 @@ class Enrollment(models.Model):
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     class Meta:
         unique_together = ('student', 'course')
+        indexes = [models.Index(fields=['enrolled_at', 'id'], name='enrollment_enrolled_id_idx')]
 
 # --- Class `Feedback`: High-level intent
 
@@ -100,11 +197,55 @@ class Feedback(models.Model):
     rating = models.PositiveSmallIntegerField()
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     # --- Class `Meta`: High-level intent
     # This class contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['created_at', 'id'], name='feedback_created_id_idx')]
+
+# --- Class `CourseStats`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class CourseStats(models.Model):
+    """
+    Denormalized enrollment and rating figures for one course, maintained by
+    core.course_stats so listings never aggregate over enrollments or feedback.
+    `python manage.py repair_course_stats` recomputes them from scratch.
+    """
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    enrolled_count = models.PositiveIntegerField(default=0)
+    active_count = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    # Set by core.course_stats, whose F() updates bypass `auto_now`.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    # --- Def `rating_average`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def rating_average(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_total / self.rating_count, 2)
+
+    @property
+    # --- Def `rating_histogram`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def rating_histogram(self):
+        """Feedback counts for ratings 1 to 5, in that order."""
+        return [self.rating_1, self.rating_2, self.rating_3, self.rating_4, self.rating_5]
 
 # --- Class `StatusUpdate`: High-level intent
 
@@ -116,11 +257,16 @@ class StatusUpdate(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     # --- Class `Meta`: High-level intent
     # This class contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='status_created_id_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='status_user_created_id_idx'),
+        ]
 
 # --- Class `Notification`: High-level intent
 
@@ -138,3 +284,92 @@ class Notification(models.Model):
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', 'is_read', 'created_at'], name='notification_unread_idx')]
+
+# --- Class `NotificationFanOut`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class NotificationFanOut(models.Model):
+    """
+    Marks a keyed `bulk_notify` call as done. Written in the same transaction
+    as the notifications, so a redelivered job finds it and inserts nothing.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+# --- Class `ChangeLog`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class ChangeLog(models.Model):
+    """
+    Append-only record of row changes for `/api/sync/` (see core/sync.py).
+
+    `kind` names the changed model and `object_id` the row; a `delete` entry
+    is a tombstone. `user` restricts the entry to one user's feed; entries
+    without a user are visible to everyone. The auto-increment `id` is the
+    sync position.
+    """
+    UPSERT, DELETE = 'upsert', 'delete'
+    ACTION_CHOICES = ((UPSERT, 'Created or updated'), (DELETE, 'Deleted'))
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    # No constraint: tombstones are written while a user's rows are being
+    # cascade-deleted, and entries for deleted users simply age out.
+    user = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+',
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    # --- Class `Meta`: High-level intent
+    # This class contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'object_id', 'user'], name='changelog_object_idx'),
+            models.Index(fields=['created_at'], name='changelog_created_idx'),
+        ]
+
+# --- Class `Job`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class Job(models.Model):
+    """
+    A deferred side effect waiting for (or claimed by) a `run_workers` process.
+
+    `name` selects a handler registered in `core.jobs`; `payload` holds its
+    keyword arguments. A claimed job stays invisible to other workers until
+    `locked_until`; if it is not finished by then it is handed out again.
+    """
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = ((QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed'))
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # --- Class `Meta`: High-level intent
+    # This class contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')]
+
+    # --- Def `__str__`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
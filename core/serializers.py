@@ -8,8 +8,176 @@ Notes for the marker/reviewer:
 
 """
 
+from collections import namedtuple
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import User, Course, Enrollment, Feedback, StatusUpdate, CourseMaterial
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.reverse import reverse
+from .models import (
+    User, Course, CourseStats, Enrollment, Feedback, StatusUpdate, CourseMaterial, Notification, UploadSession,
+)
+from .thumbnails import FORMATS, current_variants, photo_variant_urls
+from .uploads import MAX_UPLOAD_SIZE
+
+# Sparse fieldsets and expansion
+# --- Class `FieldSpec`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class FieldSpec(namedtuple('FieldSpec', 'only expand collapse nested')):
+    """
+    The `?fields=` / `?expand=` / `?collapse=` selection for one serializer level.
+
+    `only` is the set of field names to render (`None` for all), `expand`
+    the expandable relations to embed, `collapse` the collapsible relations
+    to send as ids, and `nested` pairs each field name
+    with the spec of the serializer below it. Specs are hashable, so query
+    plans can be cached per selection.
+    """
+    # --- Def `child`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def child(self, name):
+        return dict(self.nested).get(name, DEFAULT_FIELD_SPEC)
+
+DEFAULT_FIELD_SPEC = FieldSpec(None, frozenset(), frozenset(), ())
+
+# --- Def `parse_field_spec`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def parse_field_spec(fields='', expand='', collapse=''):
+    """
+    Build a `FieldSpec` from comma-separated dotted paths, e.g.
+    `fields='id,course.title'` and `expand='course'`. Naming a nested field
+    selects its parent; expanding a nested relation expands its parents.
+    Collapsing a nested relation leaves its parents embedded.
+    """
+    # --- Def `node`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def node():
+        return {'only': None, 'expand': set(), 'collapse': set(), 'nested': {}}
+
+    # --- Def `freeze`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def freeze(level):
+        return FieldSpec(
+            None if level['only'] is None else frozenset(level['only']),
+            frozenset(level['expand']),
+            frozenset(level['collapse']),
+            tuple(sorted((name, freeze(child)) for name, child in level['nested'].items())),
+        )
+
+    root = node()
+    for key, paths in (('only', fields), ('expand', expand), ('collapse', collapse)):
+        for path in filter(None, (path.strip() for path in paths.split(','))):
+            level = root
+            names = path.split('.')
+            for depth, name in enumerate(names, 1):
+                if key != 'collapse' or depth == len(names):
+                    if level[key] is None:
+                        level[key] = set()
+                    level[key].add(name)
+                level = level['nested'].setdefault(name, node())
+    return freeze(root)
+
+# --- Def `request_field_spec`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def request_field_spec(request):
+    """
+    The `FieldSpec` asked for by a request's query string. `fields` only
+    trims reads: on writes every field is still validated and rendered.
+    """
+    if request is None:
+        return DEFAULT_FIELD_SPEC
+    params = request.query_params
+    fields = params.get('fields', '') if request.method in SAFE_METHODS else ''
+    return parse_field_spec(fields, params.get('expand', ''), params.get('collapse', ''))
+
+# --- Class `DynamicFieldsModelSerializer`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    A `ModelSerializer` that honours `?fields=`, `?expand=` and `?collapse=`.
+
+    Relations listed in `Meta.expandable_fields` render as primary keys
+    unless expanded; those in `Meta.collapsible_fields` are embedded unless
+    collapsed. The top-level serializer reads the request from its
+    context (or takes an explicit `field_spec`) and hands each nested
+    serializer its part of the selection.
+    """
+    # --- Def `__init__`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def __init__(self, *args, field_spec=None, **kwargs):
+        self._field_spec = field_spec
+        super().__init__(*args, **kwargs)
+
+    @property
+    # --- Def `field_spec`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def field_spec(self):
+        if self._field_spec is None:
+            self._field_spec = request_field_spec(self.context.get('request'))
+        return self._field_spec
+
+    # --- Def `get_fields`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_fields(self):
+        spec = self.field_spec
+        fields = super().get_fields()
+        if spec.only is not None:
+            fields = {name: field for name, field in fields.items() if name in spec.only}
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        collapsible = getattr(self.Meta, 'collapsible_fields', ())
+        for name, field in fields.items():
+            if (name in expandable and name not in spec.expand) or (name in collapsible and name in spec.collapse):
+                fields[name] = _collapsed(field)
+                continue
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, DynamicFieldsModelSerializer):
+                nested._field_spec = spec.child(name)
+        return fields
+
+# --- Def `_collapsed`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def _collapsed(field):
+    """A read-only primary key field standing in for a nested serializer."""
+    kwargs = {'source': field.source} if field.source else {}
+    return serializers.PrimaryKeyRelatedField(
+        read_only=True, many=isinstance(field, serializers.ListSerializer), **kwargs,
+    )
+
+# --- Class `PhotoVariantsField`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class PhotoVariantsField(serializers.Field):
+    """
+    A user's resized photos as `[{"width", "webp", "jpeg"}]`, smallest first,
+    so clients pick the size they show; `null` until they are generated. It
+    reads only the recorded variants, so the values fast path renders it.
+    """
+
+    # --- Def `to_representation`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def to_representation(self, value):
+        variants = photo_variant_urls(value)
+        return [{'width': width, **urls} for width, urls in variants] or None
 
 # --- Class `UserSerializer`: High-level intent
 
@@ -17,13 +185,61 @@ from .models import User, Course, Enrollment, Feedback, StatusUpdate, CourseMate
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsModelSerializer):
+    photo = PhotoVariantsField(source='photo_variants', read_only=True)
+
     # --- Class `Meta`: High-level intent
     # This class contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     class Meta:
         model = User
-        fields = ['id', 'username', 'first_name', 'last_name', 'role']
+        fields = ['id', 'username', 'first_name', 'last_name', 'role', 'photo']
+
+# --- Class `MaterialDownloadField`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class MaterialDownloadField(serializers.FileField):
+    """A material's file as its download URL: the storage is not served directly."""
+
+    # --- Def `to_representation`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return reverse('core:download_material', args=[value.instance.pk], request=self.context.get('request'))
+
+# --- Class `MaterialPreviewField`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class MaterialPreviewField(serializers.Field):
+    """A material's previews as `[{"width", "webp", "jpeg"}]` URLs, smallest first; `null` if it has none."""
+
+    # --- Def `to_representation`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def to_representation(self, material):
+        variants = current_variants(material.previews, material.file.name)
+        request = self.context.get('request')
+        return [
+            {'width': width, **{
+                fmt: reverse('core:material_preview', args=[material.pk, width, fmt], request=request)
+                for fmt in FORMATS
+            }}
+            for width in sorted(variants.get('widths') or ())
+        ] or None
 
 # --- Class `CourseMaterialSerializer`: High-level intent
 
@@ -31,13 +247,36 @@ class UserSerializer(serializers.ModelSerializer):
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class CourseMaterialSerializer(serializers.ModelSerializer):
+class CourseMaterialSerializer(DynamicFieldsModelSerializer):
+    file = MaterialDownloadField(read_only=True)
+    preview = MaterialPreviewField(source='*', read_only=True)
+
     # --- Class `Meta`: High-level intent
     # This class contributes to the domain model or view/controller layer.
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
     class Meta:
         model = CourseMaterial
-        fields = ['id', 'file', 'uploaded_at']
+        fields = ['id', 'name', 'file', 'preview', 'uploaded_at']
+
+# --- Class `CourseStatsSerializer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class CourseStatsSerializer(DynamicFieldsModelSerializer):
+    rating_average = serializers.FloatField(read_only=True)
+    rating_histogram = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+
+    # --- Class `Meta`: High-level intent
+
+    # This class contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    class Meta:
+        model = CourseStats
+        fields = ['enrolled_count', 'active_count', 'rating_count', 'rating_average', 'rating_histogram']
 
 # --- Class `CourseSerializer`: High-level intent
 
@@ -45,9 +284,10 @@ class CourseMaterialSerializer(serializers.ModelSerializer):
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(DynamicFieldsModelSerializer):
     teacher = UserSerializer(read_only=True)
     course_materials = CourseMaterialSerializer(many=True, read_only=True)
+    stats = CourseStatsSerializer(read_only=True)
 
     # --- Class `Meta`: High-level intent
 
@@ -57,7 +297,7 @@ class CourseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Course
-        fields = ['id', 'title', 'description', 'teacher', 'course_materials']
+        fields = ['id', 'title', 'description', 'teacher', 'course_materials', 'stats']
 
 # --- Class `EnrollmentSerializer`: High-level intent
 
@@ -65,7 +305,7 @@ class CourseSerializer(serializers.ModelSerializer):
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class EnrollmentSerializer(serializers.ModelSerializer):
+class EnrollmentSerializer(DynamicFieldsModelSerializer):
     student = UserSerializer(read_only=True)
     course = CourseSerializer(read_only=True)
 
@@ -78,6 +318,9 @@ class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
         fields = ['id', 'student', 'course', 'enrolled_at', 'is_blocked']
+        # Embedded as it always was; `?collapse=course` sends the id alone and
+        # skips the course tree (teacher, materials, stats).
+        collapsible_fields = ['course']
 
 # --- Class `FeedbackSerializer`: High-level intent
 
@@ -85,7 +328,7 @@ class EnrollmentSerializer(serializers.ModelSerializer):
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(DynamicFieldsModelSerializer):
     student = UserSerializer(read_only=True)
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
 
@@ -105,7 +348,7 @@ class FeedbackSerializer(serializers.ModelSerializer):
 
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
-class StatusUpdateSerializer(serializers.ModelSerializer):
+class StatusUpdateSerializer(DynamicFieldsModelSerializer):
     user = UserSerializer(read_only=True)
 
     # --- Class `Meta`: High-level intent
@@ -117,3 +360,335 @@ class StatusUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = StatusUpdate
         fields = ['id', 'user', 'content', 'created_at']
+
+# --- Class `SyncCourseMaterialSerializer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SyncCourseMaterialSerializer(CourseMaterialSerializer):
+    """A material on its own, as `/api/sync/` sends it: with its course id."""
+
+    # --- Class `Meta`: High-level intent
+
+    # This class contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    class Meta(CourseMaterialSerializer.Meta):
+        fields = CourseMaterialSerializer.Meta.fields + ['course']
+
+# --- Class `NotificationSerializer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class NotificationSerializer(DynamicFieldsModelSerializer):
+
+    # --- Class `Meta`: High-level intent
+
+    # This class contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'message', 'created_at', 'is_read']
+
+# --- Class `UploadSessionSerializer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class UploadSessionSerializer(DynamicFieldsModelSerializer):
+    """A resumable material upload; `received` is the offset of the next chunk."""
+
+    # --- Class `Meta`: High-level intent
+
+    # This class contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'course', 'filename', 'size', 'received', 'created_at', 'updated_at']
+        read_only_fields = ['received', 'created_at', 'updated_at']
+        extra_kwargs = {'size': {'min_value': 1, 'max_value': MAX_UPLOAD_SIZE}}
+
+    # --- Def `validate_course`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def validate_course(self, course):
+        if course.teacher_id != self.context['request'].user.pk:
+            raise serializers.ValidationError('You can only upload materials to your own courses.')
+        return course
+
+    # --- Def `validate_filename`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def validate_filename(self, filename):
+        filename = filename.replace('\\', '/').split('/')[-1].strip()
+        if not filename:
+            raise serializers.ValidationError('Give the file a name.')
+        return filename
+
+# --- Class `BulkBlockSerializer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class BulkBlockSerializer(serializers.Serializer):
+    """Input of the course `enrollments/block` action."""
+    students = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    blocked = serializers.BooleanField()
+
+# --- Class `SearchResultSerializer`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SearchResultSerializer(serializers.Serializer):
+    """Renders the hit dictionaries produced by `core.search.search`."""
+    kind = serializers.CharField()
+    id = serializers.IntegerField(source='object.pk')
+    title = serializers.SerializerMethodField()
+    snippet = serializers.CharField()
+    score = serializers.FloatField()
+    url = serializers.SerializerMethodField()
+
+    # --- Def `get_title`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_title(self, hit):
+        obj = hit['object']
+        if hit['kind'] == 'user':
+            return obj.get_full_name() or obj.username
+        if hit['kind'] == 'course':
+            return obj.title
+        return f'Feedback by {obj.student.username} on {obj.course.title}'
+
+    # --- Def `get_url`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_url(self, hit):
+        return reverse(f"{hit['kind']}-detail", args=[hit['object'].pk], request=self.context.get('request'))
+
+QueryPlan = namedtuple('QueryPlan', 'select prefetch columns')
+
+# --- Def `get_query_plan`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+@lru_cache(maxsize=256)
+def get_query_plan(serializer_class, spec=DEFAULT_FIELD_SPEC):
+    """
+    Derive the lookups and columns a serializer needs for a field selection.
+
+    The serializer's fields are walked recursively. Nested serializers whose
+    source is a forward (or reverse one-to-one) relation are joined with
+    `select_related`; to-many relations, and anything nested below them, are
+    loaded with `prefetch_related`. Collapsed and unselected relations are
+    not loaded at all.
+
+    Returns a `QueryPlan`. `columns` pairs the main queryset (`''`) and each
+    prefetch lookup with its model and the fields to pass to `.only()`;
+    levels whose serializer reads properties or methods load every column.
+    The result is cached per serializer class and selection.
+    """
+    select, prefetch, columns = [], [], {}
+    _collect_lookups(
+        serializer_class(field_spec=spec), serializer_class.Meta.model, '', '', '', False, None,
+        select, prefetch, columns,
+    )
+    return QueryPlan(
+        tuple(select), tuple(prefetch),
+        tuple((root, model, tuple(sorted(fields))) for root, (model, fields) in columns.items()),
+    )
+
+# --- Def `_collect_lookups`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def _collect_lookups(serializer, model, prefix, root, rel, prefetching, link, select, prefetch, columns):
+    # `root` is the lookup whose queryset loads `model` rows ('' for the main
+    # queryset), `rel` the select_related path from it, and `link` the foreign
+    # key a prefetched row needs to be matched with its parent.
+    _, loaded = columns.setdefault(root, (model, set()))
+    needed = {model._meta.pk.name} | ({link} if link else set())
+    exact = True
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            # A property, method or `source='*'` may read any column.
+            exact = False
+            continue
+        if not model_field.is_relation or model_field.concrete:
+            needed.add(model_field.name)
+        if isinstance(field, serializers.ListSerializer):
+            nested = field.child
+        elif isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+            nested = field
+        else:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        lookup = prefix + field.source
+        to_many = model_field.one_to_many or model_field.many_to_many
+        if prefetching or to_many:
+            prefetch.append(lookup)
+            child_root, child_rel = lookup, ''
+            child_link = model_field.field.name if model_field.one_to_many else None
+        else:
+            select.append(lookup)
+            child_root, child_rel, child_link = root, f'{rel}{field.source}__', None
+            needed.add(model_field.name)
+
+        if isinstance(nested, serializers.BaseSerializer):
+            _collect_lookups(
+                nested, model_field.related_model, lookup + '__', child_root, child_rel,
+                prefetching or to_many, child_link, select, prefetch, columns,
+            )
+        else:
+            related = model_field.related_model
+            columns[lookup] = (related, {related._meta.pk.name} | ({child_link} if child_link else set()))
+
+    if not exact:
+        needed = {f.name for f in model._meta.concrete_fields}
+    loaded.update(rel + name for name in needed)
+
+# --- Def `plan_queryset`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def plan_queryset(queryset, serializer_class, spec=DEFAULT_FIELD_SPEC, trim=False, always_load=()):
+    """
+    Apply the `get_query_plan` lookups to `queryset`. With `trim`, every
+    queryset also defers the columns the selection does not render;
+    `always_load` names further fields of the main model the caller reads.
+    """
+    plan = get_query_plan(serializer_class, spec)
+    columns = {root: (model, fields) for root, model, fields in plan.columns} if trim else {}
+    if plan.select:
+        queryset = queryset.select_related(*plan.select)
+    if plan.prefetch:
+        queryset = queryset.prefetch_related(*(
+            Prefetch(lookup, queryset=columns[lookup][0]._default_manager.only(*columns[lookup][1]))
+            if lookup in columns else lookup
+            for lookup in plan.prefetch
+        ))
+    if '' in columns:
+        queryset = queryset.only(*columns[''][1], *always_load)
+    return queryset
+
+# Read-only fast path
+# DRF fields whose output equals the value `.values()` reads from the database.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+ValuesPlan = namedtuple('ValuesPlan', 'lookups build')
+
+# --- Class `_NeedsInstance`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class _NeedsInstance(Exception):
+    """A field cannot be rendered from a `.values()` row."""
+
+# --- Def `get_values_plan`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+@lru_cache(maxsize=256)
+def get_values_plan(serializer_class, spec=DEFAULT_FIELD_SPEC):
+    """
+    Compile a read-only rendering of `serializer_class` from `.values()` rows.
+
+    Returns a `ValuesPlan` whose `lookups` go to `QuerySet.values()` and
+    whose `build(row)` returns the same dictionary the serializer would,
+    without creating model instances or walking DRF's field machinery. Model
+    columns and forward relations nested through serializers are supported;
+    returns `None` when a rendered field needs an instance (to-many
+    relations, files, properties, methods), so the caller falls back to the
+    serializer. The result is cached per serializer class and selection.
+    """
+    lookups = []
+    try:
+        entries = _compile_values(serializer_class(field_spec=spec), serializer_class.Meta.model, '', lookups)
+    except _NeedsInstance:
+        return None
+    return ValuesPlan(tuple(dict.fromkeys(lookups)), _row_builder(entries))
+
+# --- Def `_compile_values`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def _compile_values(serializer, model, prefix, lookups):
+    # Each entry is `(key, lookup, convert, nested)`: the output key, the
+    # `.values()` key it reads (for a nested object, its foreign key, which
+    # decides between `None` and the object), and how to render it.
+    entries = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise _NeedsInstance(name)
+        lookup = prefix + field.source
+        if isinstance(field, serializers.BaseSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise _NeedsInstance(name)
+            nested = _compile_values(field, model_field.related_model, lookup + '__', lookups)
+            entries.append((name, lookup, None, _row_builder(nested)))
+        elif model_field.is_relation and not (
+            isinstance(field, serializers.PrimaryKeyRelatedField) and model_field.concrete
+        ):
+            raise _NeedsInstance(name)
+        elif isinstance(field, serializers.FileField):
+            raise _NeedsInstance(name)
+        else:
+            convert = None if isinstance(field, PASSTHROUGH_FIELDS) else field.to_representation
+            entries.append((name, lookup, convert, None))
+        lookups.append(lookup)
+    return entries
+
+# --- Def `_row_builder`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def _row_builder(entries):
+    entries = tuple(entries)
+
+    # --- Def `build`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def build(row):
+        data = {}
+        for key, lookup, convert, nested in entries:
+            value = row[lookup]
+            if value is None:
+                data[key] = None
+            elif nested is not None:
+                data[key] = nested(row)
+            elif convert is not None:
+                data[key] = convert(value)
+            else:
+                data[key] = value
+        return data
+    return build
@@ -8,9 +8,15 @@ Notes for the marker/reviewer:
 
 """
 
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
-from .models import Enrollment, Course, Notification, CourseMaterial
+from .models import User, ChangeLog, Enrollment, Course, CourseStats, Feedback, Notification, CourseMaterial
+from .jobs import enqueue
+from . import archives, blobs, catalogue, course_stats, search, sync, thumbnails
+from . import notifications  # also registers the notification job handlers
 
 @receiver(post_save, sender=Enrollment)
 # --- Def `notify_teacher_on_enroll`: High-level intent
@@ -18,8 +24,7 @@ from .models import Enrollment, Course, Notification, CourseMaterial
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 def notify_teacher_on_enroll(sender, instance, created, **kwargs):
     if created:
-        msg = f"{instance.student.username} enrolled on {instance.course.title}"
-        Notification.objects.create(user=instance.course.teacher, message=msg)
+        enqueue('notify_teacher_of_enrollment', enrollment_id=instance.pk)
 
 @receiver(post_save, sender=CourseMaterial)
 # --- Def `notify_students_on_new_material`: High-level intent
@@ -27,6 +32,188 @@ def notify_teacher_on_enroll(sender, instance, created, **kwargs):
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 def notify_students_on_new_material(sender, instance, created, **kwargs):
     if created:
-        course = instance.course
-        for enr in course.enrollment_set.select_related("student").all():
-            Notification.objects.create(user=enr.student, message=f"New material in {course.title}")
+        enqueue(
+            'notify_course_students',
+            course_id=instance.course_id,
+            message=f"New material in {instance.course.title}",
+            key=f'material-{instance.pk}',
+        )
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Feedback)
+# --- Def `update_search_index`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    # Saves that only touch unindexed columns (e.g. `last_login` on every
+    # login) leave the document as it is.
+    if update_fields and not search.KINDS_BY_MODEL[sender].fields & set(update_fields):
+        return
+    search.index_instance(instance)
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Feedback)
+# --- Def `remove_from_search_index`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+@receiver(post_save, sender=Notification)
+# --- Def `push_new_notification`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def push_new_notification(sender, instance, created, **kwargs):
+    # Bulk inserts bypass this signal; core.notifications.bulk_notify pushes those itself.
+    if created:
+        notifications.push_created([instance])
+
+STATS_DELTAS = {Enrollment: course_stats.enrollment_delta, Feedback: course_stats.feedback_delta}
+
+@receiver(post_save, sender=Course)
+# --- Def `create_course_stats`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def create_course_stats(sender, instance, created, **kwargs):
+    if created:
+        CourseStats.objects.create(course=instance)
+
+@receiver(pre_save, sender=Enrollment)
+@receiver(pre_save, sender=Feedback)
+# --- Def `remember_stats_contribution`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def remember_stats_contribution(sender, instance, **kwargs):
+    # An update may move the row to another course or change what it counts
+    # for (blocking, a new rating), so withdraw what the stored row counted.
+    instance._stats_before = None
+    if not instance._state.adding:
+        instance._stats_before = sender.objects.filter(pk=instance.pk).first()
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_save, sender=Feedback)
+# --- Def `update_course_stats`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def update_course_stats(sender, instance, **kwargs):
+    delta = STATS_DELTAS[sender]
+    before = getattr(instance, '_stats_before', None)
+    if before is not None and before.course_id != instance.course_id:
+        course_stats.apply(before.course_id, delta(before, -1))
+        before = None
+    change = delta(instance)
+    if before is not None:
+        change.subtract(delta(before))
+    course_stats.apply(instance.course_id, change)
+
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_delete, sender=Feedback)
+# --- Def `withdraw_course_stats`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def withdraw_course_stats(sender, instance, **kwargs):
+    course_stats.apply(instance.course_id, STATS_DELTAS[sender](instance, -1))
+
+@receiver(pre_save, sender=CourseMaterial)
+# --- Def `remember_material_blob`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def remember_material_blob(sender, instance, **kwargs):
+    # Replacing a material's file moves its reference to the new blob.
+    instance._blob_before = None
+    if not instance._state.adding:
+        instance._blob_before = sender.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+
+@receiver(post_save, sender=CourseMaterial)
+# --- Def `count_blob_reference`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def count_blob_reference(sender, instance, **kwargs):
+    before = getattr(instance, '_blob_before', None)
+    if before != instance.file.name:
+        blobs.acquire(instance.file.name)
+        blobs.release(before)
+
+@receiver(post_delete, sender=CourseMaterial)
+# --- Def `release_blob_reference`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def release_blob_reference(sender, instance, **kwargs):
+    blobs.release(instance.file.name)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=CourseMaterial)
+# --- Def `schedule_derivatives`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def schedule_derivatives(sender, instance, update_fields=None, **kwargs):
+    # A new photo or material file gets thumbnails / previews in the background.
+    kind = thumbnails.KINDS_BY_MODEL[sender]
+    if update_fields and kind.file_field not in update_fields:
+        return
+    thumbnails.schedule(instance)
+
+@receiver(post_save, sender=CourseMaterial)
+@receiver(post_delete, sender=CourseMaterial)
+# --- Def `invalidate_material_manifest`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def invalidate_material_manifest(sender, instance, **kwargs):
+    # After commit, like the catalogue: see core/catalogue.py.
+    transaction.on_commit(partial(archives.invalidate, instance.course_id))
+
+# Teacher fields that appear in the serialized catalogue.
+CATALOGUE_USER_FIELDS = {'username', 'first_name', 'last_name', 'role', 'photo_variants'}
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseMaterial)
+@receiver(post_delete, sender=CourseMaterial)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+# --- Def `invalidate_catalogue`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def invalidate_catalogue(sender, **kwargs):
+    # Enrollments and feedback change the course stats shown in the catalogue.
+    # Moved on only once the change is committed: a page built from the
+    # rows before it could otherwise be cached under the new version.
+    transaction.on_commit(catalogue.invalidate)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+# --- Def `invalidate_catalogue_for_teacher`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def invalidate_catalogue_for_teacher(sender, instance, update_fields=None, **kwargs):
+    # Students signing up or logging in (`last_login`) leave the catalogue alone.
+    if update_fields and not CATALOGUE_USER_FIELDS & set(update_fields):
+        return
+    if instance.role == 'teacher':
+        transaction.on_commit(catalogue.invalidate)
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=CourseMaterial)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_save, sender=Feedback)
+@receiver(post_save, sender=Notification)
+# --- Def `log_sync_upsert`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def log_sync_upsert(sender, instance, **kwargs):
+    sync.record([instance])
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=CourseMaterial)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_delete, sender=Feedback)
+@receiver(post_delete, sender=Notification)
+# --- Def `log_sync_delete`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def log_sync_delete(sender, instance, **kwargs):
+    sync.record([instance], ChangeLog.DELETE)
@@ -10,13 +10,53 @@ Notes for the marker/reviewer:
 
 # core/tests.py
 
-from django.test import TestCase
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+import zlib
+from datetime import timedelta
+from io import BytesIO, StringIO
+from itertools import count
+from unittest import mock, skipIf
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
+from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import User, Course, Feedback, StatusUpdate, Enrollment
+from django.core.management import CommandError, call_command
+from .models import (
+    User, Blob, ChangeLog, Course, CourseStats, Feedback, StatusUpdate, Enrollment, CourseMaterial, Notification, Job,
+    UploadSession,
+)
+from . import (
+    archives, blobs, catalogue, course_stats, downloads, jobs, notifications, rosters, search, storage, sync, thumbnails, uploads,
+)
+from .serializers import (
+    CourseSerializer, EnrollmentSerializer, FeedbackSerializer, StatusUpdateSerializer, UserSerializer,
+    get_values_plan, parse_field_spec,
+)
 from .forms import FeedbackForm
+from PIL import Image
 
 User = get_user_model()
 
@@ -52,6 +92,13 @@ class BaseAPIFixture(APITestCase):
             teacher=cls.teacher,
         )
 
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        # Cached catalogue pages would outlive the rollback of the test that built them.
+        caches[catalogue.CATALOGUE_CACHE].clear()
+
     # --- Def `login_teacher`: High-level intent
 
     # This function contributes to the domain model or view/controller layer.
@@ -153,9 +200,84 @@ class StatusUpdateAPITests(BaseAPIFixture):
         self.client.post(url, {"content": "Second"}, format="json")
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        contents = [row["content"] for row in resp.json()]
+        contents = [row["content"] for row in resp.json()["results"]]
         self.assertLess(contents.index("Second"), contents.index("First"))
 
+# --- Class `CursorPaginationTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class CursorPaginationTests(BaseAPIFixture):
+    """Tests for keyset cursor pagination on the API and HTML list views."""
+    @classmethod
+    # --- Def `setUpTestData`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(7):
+            StatusUpdate.objects.create(user=cls.student, content=f"Update {i}")
+        # Identical timestamps force the cursor to break ties on `id`.
+        StatusUpdate.objects.update(created_at=StatusUpdate.objects.first().created_at)
+
+    # --- Def `test_api_pages_cover_every_row_once`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_api_pages_cover_every_row_once(self):
+        """Walk forward and back through the pages and check no row is skipped or repeated."""
+        self.login_student()
+        url = reverse("statusupdate-list") + "?page_size=3"
+        seen, pages = [], []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([row["id"] for row in body["results"]])
+            seen.extend(pages[-1])
+            url = body["next"]
+        expected = list(StatusUpdate.objects.order_by("-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        self.assertIsNone(self.client.get(reverse("statusupdate-list") + "?page_size=3").json()["previous"])
+        back = self.client.get(body["previous"]).json()
+        self.assertEqual([row["id"] for row in back["results"]], pages[1])
+
+    # --- Def `test_invalid_cursor_is_not_found`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_invalid_cursor_is_not_found(self):
+        self.login_student()
+        resp = self.client.get(reverse("statusupdate-list") + "?cursor=not-a-cursor")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    # --- Def `test_profile_status_history_is_paginated`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_profile_status_history_is_paginated(self):
+        for i in range(7, 12):
+            StatusUpdate.objects.create(user=self.student, content=f"Update {i}")
+        self.login_student()
+        url = reverse("core:user_profile", kwargs={"username": "student1"})
+        first = self.client.get(url).context["status_updates"]
+        self.assertEqual(len(first), 10)
+        second = self.client.get(url, {"cursor": first.next_cursor}).context["status_updates"]
+        self.assertEqual(len(second), 2)
+        self.assertFalse(second.has_next)
+
+    # --- Def `test_course_list_view_is_paginated`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_list_view_is_paginated(self):
+        Course.objects.bulk_create(
+            Course(title=f"Course {i}", description="Paged", teacher=self.teacher) for i in range(30)
+        )
+        self.login_student()
+        resp = self.client.get(reverse("core:course_list"))
+        self.assertEqual(len(resp.context["courses"]), 24)
+        resp = self.client.get(reverse("core:course_list"), {"cursor": resp.context["page_obj"].next_cursor})
+        self.assertEqual(len(resp.context["courses"]), 7)
+
 # --- Class `FormTests`: High-level intent
 
 # This class contributes to the domain model or view/controller layer.
@@ -365,3 +487,1880 @@ class BlockStudentViewTests(BaseAPIFixture):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 403)
         self.assertFalse(Enrollment.objects.filter(student=self.other_student).exists())
+
+# --- Class `MaterialNotificationTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class MaterialNotificationTests(BaseAPIFixture):
+    """Tests for the notification fan-out when a material is uploaded."""
+    # --- Def `test_active_students_are_notified_in_bulk`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_active_students_are_notified_in_bulk(self):
+        """Every active student gets one notification; blocked students get none."""
+        Enrollment.objects.create(student=self.student, course=self.course)
+        Enrollment.objects.create(student=self.other_student, course=self.course, is_blocked=True)
+        students = User.objects.bulk_create(
+            User(username=f"bulk{i}", role="student") for i in range(30)
+        )
+        Enrollment.objects.bulk_create(Enrollment(student=s, course=self.course) for s in students)
+        jobs.run_pending()
+
+        with CaptureQueriesContext(connection) as upload:
+            CourseMaterial.objects.create(course=self.course, file="course_materials/notes.pdf")
+        notified = Notification.objects.filter(message="New material in Intro to Testing")
+        self.assertFalse(notified.exists())
+
+        with CaptureQueriesContext(connection) as fan_out:
+            jobs.run_pending()
+        self.assertEqual(notified.count(), 31)
+        self.assertFalse(notified.filter(user=self.other_student).exists())
+        self.assertEqual(User.objects.get(pk=self.student.pk).unread_notifications, 1)
+        self.assertEqual(User.objects.get(pk=self.other_student.pk).unread_notifications, 0)
+        self.assertLess(len(upload), 5)
+        self.assertLess(len(fan_out), 13)
+
+    # --- Def `test_redelivered_fan_out_notifies_nobody_twice`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_redelivered_fan_out_notifies_nobody_twice(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        jobs.run_pending()
+        CourseMaterial.objects.create(course=self.course, file="course_materials/notes.pdf")
+        fan_out = Job.objects.get(name="notify_course_students")
+        jobs.run_pending()
+
+        # A worker that died after committing has its job handed out again.
+        Job.objects.filter(pk=fan_out.pk).update(status=Job.QUEUED)
+        jobs.run_pending()
+        notified = Notification.objects.filter(message="New material in Intro to Testing")
+        self.assertEqual(notified.count(), 1)
+        self.assertEqual(User.objects.get(pk=self.student.pk).unread_notifications, 1)
+
+    # --- Def `test_teacher_is_notified_of_enrollment`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_teacher_is_notified_of_enrollment(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        jobs.run_pending()
+        self.assertTrue(Notification.objects.filter(
+            user=self.teacher, message="student1 enrolled on Intro to Testing"
+        ).exists())
+
+# --- Class `UnreadNotificationTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class UnreadNotificationTests(BaseAPIFixture):
+    """The cached unread counter, the capped dashboard list and bulk mark-as-read."""
+    # --- Def `unread`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def unread(self):
+        return User.objects.get(pk=self.student.pk).unread_notifications
+
+    # --- Def `test_counter_follows_create_and_read`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_counter_follows_create_and_read(self):
+        self.login_student()
+        first = notifications.notify(self.student.pk, "One")
+        notifications.notify(self.student.pk, "Two")
+        self.assertEqual(self.unread(), 2)
+        url = reverse("core:mark_notification_as_read", args=[first.pk])
+        self.client.get(url)
+        self.client.get(url)  # marking twice must not decrement twice
+        self.assertEqual(self.unread(), 1)
+        other = notifications.notify(self.teacher.pk, "Not yours")
+        response = self.client.get(reverse("core:mark_notification_as_read", args=[other.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    # --- Def `test_mark_all_read_is_one_update`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_mark_all_read_is_one_update(self):
+        self.login_student()
+        notifications.bulk_notify([self.student.pk], "Hello")
+        for i in range(5):
+            notifications.notify(self.student.pk, f"Note {i}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("core:mark_all_notifications_as_read"))
+        self.assertEqual(response.status_code, 302)
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "core_notification"')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Notification.objects.filter(user=self.student, is_read=False).exists())
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(self.client.get(reverse("core:mark_all_notifications_as_read")).status_code, 405)
+
+    # --- Def `test_dashboard_lists_are_capped`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_dashboard_lists_are_capped(self):
+        self.login_student()
+        total = notifications.RECENT_NOTIFICATIONS + 5
+        notifications.bulk_notify([self.student.pk], "Old")
+        for i in range(total - 1):
+            notifications.notify(self.student.pk, f"Note {i}")
+        response = self.client.get(reverse("core:student_dashboard"))
+        self.assertEqual(len(response.context["notifications"]), notifications.RECENT_NOTIFICATIONS)
+        self.assertEqual(response.context["notifications"][0].message, f"Note {total - 2}")
+        self.assertContains(response, f'badge-danger">{total}<')
+
+    # --- Def `test_recount_repairs_drift`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_recount_repairs_drift(self):
+        notifications.notify(self.student.pk, "One")
+        Notification.objects.create(user=self.student, message="Created behind the module's back")
+        User.objects.filter(pk=self.teacher.pk).update(unread_notifications=7)
+        notifications.recount_unread()
+        self.assertEqual(self.unread(), 2)
+        self.assertEqual(User.objects.get(pk=self.teacher.pk).unread_notifications, 0)
+
+# --- Class `CourseStatsTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class CourseStatsTests(BaseAPIFixture):
+    """Denormalized course counters follow enrollments, blocks and feedback."""
+
+    # --- Def `stats`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def stats(self):
+        return CourseStats.objects.get(course=self.course)
+
+    # --- Def `test_counters_follow_enroll_block_and_feedback`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_counters_follow_enroll_block_and_feedback(self):
+        for login in (self.login_student, self.login_other_student):
+            login()
+            self.client.post(reverse("core:enroll_in_course", args=[self.course.id]))
+        self.login_teacher()
+        self.client.get(reverse("core:block_student", args=[self.course.id, self.other_student.id]))
+        self.login_student()
+        self.client.post(
+            reverse("core:submit_feedback", args=[self.course.id]), {"rating": 4, "comment": "Good pace."}
+        )
+        stats = self.stats()
+        self.assertEqual((stats.enrolled_count, stats.active_count), (2, 1))
+        self.assertEqual((stats.rating_count, stats.rating_average), (1, 4.0))
+        self.assertEqual(stats.rating_histogram, [0, 0, 0, 1, 0])
+
+        feedback = Feedback.objects.get(student=self.student)
+        feedback.rating = 2
+        feedback.save()
+        Feedback.objects.create(course=self.course, student=self.other_student, rating=5, comment="Great.")
+        stats = self.stats()
+        self.assertEqual((stats.rating_count, stats.rating_average), (2, 3.5))
+        self.assertEqual(stats.rating_histogram, [0, 1, 0, 0, 1])
+
+        Enrollment.objects.get(student=self.other_student).delete()
+        feedback.delete()
+        stats = self.stats()
+        self.assertEqual((stats.enrolled_count, stats.active_count, stats.rating_count), (1, 1, 1))
+        self.assertEqual(course_stats.repair(), [])
+
+    # --- Def `test_course_api_and_list_expose_stats`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_api_and_list_expose_stats(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        Feedback.objects.create(course=self.course, student=self.student, rating=5, comment="Loved it.")
+        self.login_student()
+        data = self.client.get(reverse("course-detail", args=[self.course.id])).json()
+        self.assertEqual(data["stats"], {
+            "enrolled_count": 1, "active_count": 1, "rating_count": 1,
+            "rating_average": 5.0, "rating_histogram": [0, 0, 0, 0, 1],
+        })
+        response = self.client.get(reverse("core:course_list"))
+        self.assertContains(response, "1 student")
+        self.assertContains(response, "Rated 5.0/5")
+
+    # --- Def `test_repair_command_fixes_drift`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_repair_command_fixes_drift(self):
+        # bulk_create and QuerySet.update bypass the signals.
+        Enrollment.objects.bulk_create([Enrollment(student=self.student, course=self.course)])
+        Course.objects.bulk_create([Course(title="Bulk", description="", teacher=self.teacher)])
+        out = StringIO()
+        call_command("repair_course_stats", "--dry-run", stdout=out)
+        self.assertIn("2 course(s) drifted", out.getvalue())
+        self.assertEqual(self.stats().enrolled_count, 0)
+
+        call_command("repair_course_stats", stdout=StringIO())
+        self.assertEqual(self.stats().enrolled_count, 1)
+        self.assertEqual(CourseStats.objects.count(), Course.objects.count())
+        out = StringIO()
+        call_command("repair_course_stats", stdout=out)
+        self.assertIn("consistent", out.getvalue())
+
+    # --- Def `test_repair_skips_unknown_courses_and_invalidates_after_commit`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_repair_skips_unknown_courses_and_invalidates_after_commit(self):
+        Enrollment.objects.bulk_create([Enrollment(student=self.student, course=self.course)])
+        version = catalogue.current_version()
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            call_command("repair_course_stats", str(self.course.id), "999", stdout=out)
+            self.assertEqual(catalogue.current_version(), version)
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(catalogue.current_version(), version)
+        self.assertIn("No such course(s): 999", out.getvalue())
+        self.assertIn(f"1 course(s) repaired: {self.course.id}", out.getvalue())
+        self.assertEqual(self.stats().enrolled_count, 1)
+        self.assertFalse(CourseStats.objects.filter(course_id=999).exists())
+
+# --- Class `CatalogueCacheTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class CatalogueCacheTests(BaseAPIFixture):
+    """Catalogue pages are cached until a course, material or teacher changes."""
+
+    # --- Def `get_list`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_list(self):
+        response = self.client.get(reverse("course-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response["X-Cache"], response.json()["results"][0]
+
+    # --- Def `test_api_list_is_cached_and_invalidated`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_api_list_is_cached_and_invalidated(self):
+        self.login_student()
+        catalogue.stats.reset()
+        self.assertEqual(self.get_list()[0], "MISS")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_list()[0], "HIT")
+        # Only the aggregate behind the ETag; the page itself is not read.
+        course_queries = [query["sql"] for query in queries if "core_course" in query["sql"]]
+        self.assertEqual(len(course_queries), 1)
+        self.assertIn("COUNT(", course_queries[0])
+
+        self.course.title = "Renamed"
+        # The version moves on once the change is committed.
+        version = catalogue.current_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.save()
+            self.assertEqual(catalogue.current_version(), version)
+        hit, course = self.get_list()
+        self.assertEqual((hit, course["title"]), ("MISS", "Renamed"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CourseMaterial.objects.create(course=self.course, file="course_materials/new.pdf")
+        hit, course = self.get_list()
+        self.assertEqual((hit, len(course["course_materials"])), ("MISS", 1))
+
+        self.teacher.first_name = "Professor"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.save()
+        hit, course = self.get_list()
+        self.assertEqual((hit, course["teacher"]["first_name"]), ("MISS", "Professor"))
+
+        # Logins touch only `last_login`, and students never appear in the catalogue.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.save(update_fields=["last_login"])
+            self.other_student.save()
+        self.assertEqual(self.get_list()[0], "HIT")
+        self.assertEqual((catalogue.stats.hits, catalogue.stats.misses), (2, 4))
+        self.assertAlmostEqual(catalogue.stats.hit_rate, 2 / 6)
+
+    # --- Def `test_html_list_is_cached`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_html_list_is_cached(self):
+        self.login_student()
+        self.client.get(reverse("core:course_list"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("core:course_list"))
+        self.assertContains(response, "Intro to Testing")
+        self.assertFalse(any("core_course" in query["sql"] for query in queries))
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.student, course=self.course)
+        self.assertContains(self.client.get(reverse("core:course_list")), "1 student")
+
+# --- Class `ConditionalGetTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class ConditionalGetTests(BaseAPIFixture):
+    """ETag / Last-Modified validators and 304 responses on the polled endpoints."""
+
+    # --- Def `revalidate`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # --- Def `test_unchanged_collection_is_not_modified`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_unchanged_collection_is_not_modified(self):
+        feedback = Feedback.objects.create(course=self.course, student=self.student, rating=4, comment="Fine.")
+        self.login_student()
+        url = reverse("feedback-list")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        # Session, user and one aggregate; the page itself is never fetched,
+        # and reads run outside any transaction.
+        with self.assertNumQueries(3):
+            response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertNotEqual(self.revalidate(url + "?page_size=1", etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        feedback.comment = "Better than fine."
+        feedback.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+        feedback.delete()
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    # --- Def `test_single_object_validators`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_single_object_validators(self):
+        update = StatusUpdate.objects.create(user=self.student, content="Hello")
+        self.login_student()
+        url = reverse("statusupdate-detail", args=[update.id])
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response["ETag"]).status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    # --- Def `test_author_changes_invalidate_embedding_payloads`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_author_changes_invalidate_embedding_payloads(self):
+        Feedback.objects.create(course=self.course, student=self.student, rating=4, comment="Fine.")
+        update = StatusUpdate.objects.create(user=self.student, content="Hello")
+        self.login_student()
+        urls = [reverse("feedback-list"), reverse("statusupdate-detail", args=[update.id])]
+        etags = [self.client.get(url)["ETag"] for url in urls]
+
+        # Logging in again saves only `last_login`, which no payload shows.
+        self.login_student()
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.student.first_name = "Renamed"
+        self.student.save()
+        for url, etag in zip(urls, etags):
+            response = self.revalidate(url, etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("Renamed", response.content.decode())
+
+    # --- Def `test_course_validators_follow_writes_of_other_processes`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_validators_follow_writes_of_other_processes(self):
+        self.login_student()
+        url = reverse("course-list")
+        detail = reverse("course-detail", args=[self.course.id])
+        etags = [self.client.get(url)["ETag"], self.client.get(detail)["ETag"]]
+        self.assertEqual(self.revalidate(url, etags[0]).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A worker or another server changes rows without moving this
+        # process's catalogue version.
+        with mock.patch.object(catalogue, "invalidate"):
+            material = CourseMaterial.objects.create(course=self.course, file="course_materials/new.pdf")
+        for path, etag in zip((url, detail), etags):
+            self.assertEqual(self.revalidate(path, etag).status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()["results"][0]["course_materials"]), 1)
+
+        etag = response["ETag"]
+        CourseMaterial.objects.filter(pk=material.pk).update(
+            previews={"webp": "previews/new.webp"}, updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+        etag = self.client.get(url)["ETag"]
+        CourseMaterial.objects.filter(pk=material.pk).delete()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["course_materials"], [])
+
+# --- Class `JobQueueTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class JobQueueTests(TestCase):
+    """Tests for the database-backed job queue."""
+    calls = []
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        self.calls.clear()
+        jobs.job('test.record')(lambda **payload: self.calls.append(payload))
+        jobs.job('test.explode')(lambda: 1 / 0)
+        self.addCleanup(jobs.HANDLERS.pop, 'test.record')
+        self.addCleanup(jobs.HANDLERS.pop, 'test.explode')
+
+    # --- Def `test_batch_dequeue_runs_each_job_once`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_batch_dequeue_runs_each_job_once(self):
+        for i in range(5):
+            jobs.enqueue('test.record', n=i)
+        first = jobs.claim_jobs('worker-a', limit=3)
+        second = jobs.claim_jobs('worker-b', limit=3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({j.pk for j in first} & {j.pk for j in second})
+        for claimed in first + second:
+            self.assertTrue(jobs.run_job(claimed))
+        self.assertEqual(sorted(call["n"] for call in self.calls), [0, 1, 2, 3, 4])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 5)
+
+    # --- Def `test_failed_job_is_retried_with_backoff_then_marked_failed`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_failed_job_is_retried_with_backoff_then_marked_failed(self):
+        queued = jobs.enqueue('test.explode', max_attempts=2)
+        with self.assertLogs('core.jobs', 'WARNING'):
+            jobs.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Job.QUEUED, 1))
+        self.assertIn("ZeroDivisionError", queued.last_error)
+        self.assertEqual(jobs.run_pending(), 0)  # Backing off.
+
+        Job.objects.filter(pk=queued.pk).update(run_after=queued.created_at)
+        with self.assertLogs('core.jobs', 'WARNING'):
+            jobs.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Job.FAILED, 2))
+
+    # --- Def `test_expired_claim_is_handed_out_again`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_expired_claim_is_handed_out_again(self):
+        jobs.enqueue('test.record', n=1)
+        self.assertEqual(len(jobs.claim_jobs('crashed', visibility_timeout=60)), 1)
+        self.assertEqual(jobs.claim_jobs('other'), [])
+        Job.objects.update(locked_until=Job.objects.get().created_at)
+        reclaimed = jobs.claim_jobs('other')
+        self.assertEqual([j.attempts for j in reclaimed], [2])
+        jobs.run_job(reclaimed[0])
+        self.assertEqual(self.calls, [{"n": 1}])
+
+# --- Class `QueryCountTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class QueryCountTests(BaseAPIFixture):
+    """Ensure list endpoints run a constant number of queries, whatever the row count."""
+    sequence = count()
+
+    # --- Def `assertConstantQueries`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def assertConstantQueries(self, url, make_row, extra_rows=5):
+        """GET `url` before and after adding `extra_rows` rows and compare the query counts."""
+        # Committed, as far as on-commit cache invalidation is concerned.
+        with self.captureOnCommitCallbacks(execute=True):
+            make_row()
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(extra_rows):
+                make_row()
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            len(few), len(many),
+            f"{url} ran {len(few)} queries before and {len(many)} after adding {extra_rows} rows",
+        )
+
+    # --- Def `make_user`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def make_user(self, role='student'):
+        n = next(self.sequence)
+        return User.objects.create_user(username=f"qc{role}{n}", password="pass", role=role)
+
+    # --- Def `make_course`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def make_course(self):
+        course = Course.objects.create(title="QC", description="QC", teacher=self.make_user('teacher'))
+        CourseMaterial.objects.create(course=course, file='course_materials/qc.pdf')
+        return course
+
+    # --- Def `test_course_list_queries_are_constant`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_list_queries_are_constant(self):
+        self.login_student()
+        self.assertConstantQueries(reverse("course-list"), self.make_course)
+
+    # --- Def `test_enrollment_list_queries_are_constant`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_enrollment_list_queries_are_constant(self):
+        self.login_student()
+        self.assertConstantQueries(
+            reverse("enrollment-list"),
+            lambda: Enrollment.objects.create(student=self.make_user(), course=self.make_course()),
+        )
+
+    # --- Def `test_feedback_list_queries_are_constant`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_feedback_list_queries_are_constant(self):
+        self.login_student()
+        self.assertConstantQueries(
+            reverse("feedback-list"),
+            lambda: Feedback.objects.create(
+                course=self.course, student=self.make_user(), rating=4, comment="Consistently good."
+            ),
+        )
+
+    # --- Def `test_status_update_list_queries_are_constant`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_status_update_list_queries_are_constant(self):
+        self.login_student()
+        self.assertConstantQueries(
+            reverse("statusupdate-list"),
+            lambda: StatusUpdate.objects.create(user=self.make_user(), content="Hello"),
+        )
+
+    # --- Def `test_user_list_queries_are_constant`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_user_list_queries_are_constant(self):
+        self.login_student()
+        self.assertConstantQueries(reverse("user-list"), self.make_user)
+
+    # --- Def `test_course_detail_page_queries_are_fixed`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_detail_page_queries_are_fixed(self):
+        """Session, user, course with viewer state, materials, feedback, and the roster for its teacher."""
+        Enrollment.objects.create(student=self.student, course=self.course)
+        CourseMaterial.objects.create(course=self.course, file='course_materials/qc.pdf')
+
+        def enroll_with_feedback():
+            student = self.make_user()
+            Enrollment.objects.create(student=student, course=self.course)
+            Feedback.objects.create(course=self.course, student=student, rating=4, comment="Clear.")
+
+        url = reverse("core:course_detail", args=[self.course.id])
+        for login, expected in ((self.login_student, 5), (self.login_teacher, 6)):
+            with self.subTest(login=login.__name__):
+                login()
+                self.assertConstantQueries(url, enroll_with_feedback, extra_rows=20)
+                with self.assertNumQueries(expected):
+                    response = self.client.get(url)
+                self.assertGreaterEqual(len(response.context["feedbacks"]), 21)
+
+# --- Class `SparseFieldsetTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SparseFieldsetTests(BaseAPIFixture):
+    """Tests for `?fields=` / `?expand=` and the queries they trim."""
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        super().setUp()
+        Enrollment.objects.create(student=self.student, course=self.course)
+        CourseMaterial.objects.create(course=self.course, file="course_materials/notes.pdf")
+        self.login_student()
+
+    # --- Def `get_enrollments`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_enrollments(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("enrollment-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"][0], [query["sql"] for query in queries]
+
+    # --- Def `test_parse_field_spec`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_parse_field_spec(self):
+        spec = parse_field_spec("id, course.title,course.teacher", "course.teacher", "course.teacher")
+        self.assertEqual(spec.only, {"id", "course"})
+        self.assertEqual(spec.expand, {"course"})
+        self.assertEqual(spec.collapse, set())
+        self.assertEqual(spec.child("course").collapse, {"teacher"})
+        self.assertEqual(spec.child("course").only, {"title", "teacher"})
+        self.assertEqual(spec.child("course").child("teacher").only, None)
+        self.assertEqual(spec.child("id").only, None)
+        self.assertEqual(hash(spec), hash(parse_field_spec("course.teacher,course.title,id", "course.teacher", "course.teacher")))
+
+    # --- Def `test_course_is_collapsed_on_request`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_is_collapsed_on_request(self):
+        enrollment, queries = self.get_enrollments()
+        self.assertEqual(enrollment["course"]["teacher"]["username"], "teacher1")
+        self.assertEqual(len(enrollment["course"]["course_materials"]), 1)
+        self.assertTrue(any("core_coursematerial" in sql for sql in queries))
+
+        enrollment, queries = self.get_enrollments(collapse="course")
+        self.assertEqual(enrollment["course"], self.course.id)
+        self.assertFalse(any("core_coursematerial" in sql for sql in queries))
+
+    # --- Def `test_fields_trim_payload_and_columns`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_fields_trim_payload_and_columns(self):
+        enrollment, queries = self.get_enrollments(fields="id")
+        self.assertEqual(enrollment, {"id": Enrollment.objects.get().id})
+        page_query = next(sql for sql in queries if 'FROM "core_enrollment"' in sql)
+        self.assertNotIn("is_blocked", page_query)
+        self.assertNotIn("core_user", page_query)
+
+        enrollment, queries = self.get_enrollments(fields="course.title,course.course_materials.file")
+        self.assertEqual(enrollment, {
+            "course": {"title": "Intro to Testing", "course_materials": [
+                {"file": f"http://testserver/materials/{CourseMaterial.objects.get().id}/"},
+            ]},
+        })
+        self.assertFalse(any('"core_course"."description"' in sql for sql in queries))
+        self.assertFalse(any('"core_coursematerial"."uploaded_at"' in sql for sql in queries))
+
+    # --- Def `test_fields_do_not_restrict_writes`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_fields_do_not_restrict_writes(self):
+        response = self.client.post(reverse("statusupdate-list") + "?fields=id", {"content": "Still saved"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["content"], "Still saved")
+
+# --- Class `ValuesListTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class ValuesListTests(BaseAPIFixture):
+    """The `.values()` list path must render exactly what the serializers do."""
+
+    # --- Def `assertSameOutput`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def assertSameOutput(self, serializer_class, fields="", expand="", collapse=""):
+        spec = parse_field_spec(fields, expand, collapse)
+        plan = get_values_plan(serializer_class, spec)
+        self.assertIsNotNone(plan, serializer_class.__name__)
+        queryset = serializer_class.Meta.model.objects.order_by("pk")
+        expected = serializer_class(queryset, many=True, field_spec=spec).data
+        self.assertTrue(expected)
+        self.assertEqual([plan.build(row) for row in queryset.values(*plan.lookups)], expected)
+
+    # --- Def `test_values_rows_match_serializers`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_values_rows_match_serializers(self):
+        Enrollment.objects.create(student=self.student, course=self.course, is_blocked=True)
+        Feedback.objects.create(course=self.course, student=self.student, rating=3, comment="Okay")
+        StatusUpdate.objects.create(user=self.student, content="Hello")
+        StatusUpdate.objects.create(user=self.teacher, content="")
+        for serializer_class in (UserSerializer, FeedbackSerializer, StatusUpdateSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertSameOutput(serializer_class)
+        self.assertSameOutput(EnrollmentSerializer, collapse="course")
+        self.assertSameOutput(StatusUpdateSerializer, fields="id,user.username,created_at")
+        self.assertSameOutput(CourseSerializer, fields="id,title,teacher")
+        # Materials and stats need instances; so does an embedded course.
+        self.assertIsNone(get_values_plan(CourseSerializer))
+        self.assertIsNone(get_values_plan(EnrollmentSerializer))
+
+    # --- Def `test_list_endpoints_use_values_rows`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_list_endpoints_use_values_rows(self):
+        for index in range(3):
+            StatusUpdate.objects.create(user=self.student, content=f"Update {index}")
+        self.login_student()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("statusupdate-list"), {"page_size": 2})
+        page = response.json()
+        self.assertEqual([update["content"] for update in page["results"]], ["Update 2", "Update 1"])
+        self.assertEqual(page["results"][0]["user"]["username"], "student1")
+        page_query = next(q["sql"] for q in queries if 'FROM "core_statusupdate"' in q["sql"] and "LIMIT" in q["sql"])
+        self.assertNotIn('"core_user"."password"', page_query)
+        following = self.client.get(page["next"]).json()
+        self.assertEqual([update["content"] for update in following["results"]], ["Update 0"])
+
+# --- Class `IdentityMapTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class IdentityMapTests(BaseAPIFixture):
+    """Ownership decorators and their views share one load per object."""
+
+    # --- Def `get_counting`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_counting(self, url, table, column):
+        """GET `url`; return the response and how many queries selected from `table` by `column`."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        where = f'FROM "{table}" WHERE "{table}"."{column}" ='
+        return response, sum(where in query["sql"] for query in queries)
+
+    # --- Def `test_course_pages_load_the_course_once`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_course_pages_load_the_course_once(self):
+        self.login_teacher()
+        for url in (
+            reverse("core:edit_course", args=[self.course.id]),
+            reverse("core:add_course_material", args=[self.course.id]),
+        ):
+            with self.subTest(url=url):
+                response, loads = self.get_counting(url, "core_course", "id")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(loads, 1)
+                identity_map = response.wsgi_request.identity_map
+                self.assertEqual((identity_map.hits, identity_map.misses), (1, 1))
+
+    # --- Def `test_profile_edit_loads_the_user_once`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_profile_edit_loads_the_user_once(self):
+        self.login_student()
+        response, loads = self.get_counting(
+            reverse("core:edit_profile", args=[self.student.username]), "core_user", "username"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(loads, 1)
+        self.assertEqual(response.context["object"], self.student)
+
+    # --- Def `test_decorators_still_deny_and_404`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_decorators_still_deny_and_404(self):
+        self.login_student()
+        response = self.client.get(reverse("core:edit_course", args=[self.course.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse("core:edit_profile", args=[self.other_student.username]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.login_teacher()
+        response = self.client.get(reverse("core:add_course_material", args=[self.course.id + 1000]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+# --- Class `SearchTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SearchTests(BaseAPIFixture):
+    """Full-text search: index maintenance, ranking, filtering and paging."""
+
+    # --- Def `hits`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def hits(self, **params):
+        response = self.client.get(reverse("search"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(hit["kind"], hit["id"]) for hit in response.json()["results"]]
+
+    # --- Def `test_search_ranks_title_matches_first`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_search_ranks_title_matches_first(self):
+        self.login_student()
+        in_body = Course.objects.create(title="Databases", description="Covers testing strategies", teacher=self.teacher)
+        feedback = Feedback.objects.create(course=in_body, student=self.student, rating=5, comment="Great testing tips")
+        hits = self.hits(q="testing")
+        self.assertEqual(hits[0], ("course", self.course.id))
+        self.assertCountEqual(hits[1:], [("course", in_body.id), ("feedback", feedback.id)])
+        self.assertEqual(self.hits(q="test", type="feedback"), [("feedback", feedback.id)])
+        result = self.client.get(reverse("search"), {"q": "databases"}).json()["results"][0]
+        self.assertEqual(result["title"], "Databases")
+        self.assertTrue(result["url"].endswith(reverse("course-detail", args=[in_body.id])))
+
+    # --- Def `test_index_follows_saves_and_deletes`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_index_follows_saves_and_deletes(self):
+        self.login_student()
+        self.course.title = "Advanced Cryptography"
+        self.course.save()
+        self.assertEqual(self.hits(q="cryptography"), [("course", self.course.id)])
+        self.assertEqual(self.hits(q="intro"), [])
+        self.course.delete()
+        self.assertEqual(self.hits(q="cryptography"), [])
+
+    # --- Def `test_search_pages_cover_every_hit_once`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_search_pages_cover_every_hit_once(self):
+        self.login_student()
+        for i in range(7):
+            Course.objects.create(title=f"Algebra {i}", description="Algebra", teacher=self.teacher)
+        seen, url = [], reverse("search") + "?q=algebra&page_size=3"
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(hit["id"] for hit in data["results"])
+            url = data["next"]
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+        self.assertEqual(self.client.get(reverse("search"), {"q": "x", "cursor": "bogus"}).status_code, 404)
+        self.assertEqual(self.client.get(reverse("search"), {"q": "x", "type": "planet"}).status_code, 400)
+
+    # --- Def `test_user_search_uses_the_index`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_user_search_uses_the_index(self):
+        self.login_student()
+        response = self.client.get(reverse("user-list"), {"search": "bet"})
+        self.assertEqual([u["username"] for u in response.json()["results"]], ["student2"])
+        response = self.client.get(reverse("core:search_users"), {"q": "ana"})
+        self.assertEqual(list(response.context["results"]), [self.student])
+        # Operators typed by the user are treated as plain words.
+        self.assertEqual(self.hits(q='"student1" OR NEAR('), [])
+
+    # --- Def `test_rebuild_command_restores_the_index`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_rebuild_command_restores_the_index(self):
+        self.login_student()
+        Course.objects.bulk_create([Course(title="Bulk Loaded", description="", teacher=self.teacher)])
+        self.assertEqual(self.hits(q="bulk"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(len(self.hits(q="bulk")), 1)
+        self.assertEqual(len(self.hits(q="student1")), 1)
+
+# --- Class `SyncTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class SyncTests(BaseAPIFixture):
+    """Tests for the change log and the `/api/sync/` delta endpoint."""
+
+    # --- Def `sync`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def sync(self, since=None):
+        response = self.client.get(reverse("sync"), {"since": since} if since else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    # --- Def `changes`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def changes(self, data):
+        return {(change["kind"], change["id"]): change["action"] for change in data["changes"]}
+
+    # --- Def `test_upserts_and_tombstones_since_token`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_upserts_and_tombstones_since_token(self):
+        self.login_student()
+        start = self.sync()
+        self.assertEqual(start["changes"], [])
+
+        material = CourseMaterial.objects.create(course=self.course, file="course_materials/a.pdf")
+        feedback = Feedback.objects.create(course=self.course, student=self.other_student, rating=5, comment="Great")
+        self.course.title = "Intro to Testing, 2nd ed."
+        self.course.save()
+        feedback_id = feedback.id
+        feedback.delete()
+
+        data = self.sync(start["next"])
+        self.assertEqual(self.changes(data), {
+            ("coursematerial", material.id): "upsert",
+            ("feedback", feedback_id): "delete",
+            ("course", self.course.id): "upsert",
+        })
+        course = next(change for change in data["changes"] if change["kind"] == "course")
+        self.assertEqual(course["data"]["title"], "Intro to Testing, 2nd ed.")
+        self.assertNotIn("data", next(change for change in data["changes"] if change["kind"] == "feedback"))
+        self.assertEqual(self.sync(data["next"])["changes"], [])
+
+    # --- Def `test_private_rows_reach_only_their_audience`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_private_rows_reach_only_their_audience(self):
+        self.login_other_student()
+        token = self.sync()["next"]
+        enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        notifications.bulk_notify([self.student.id], "Welcome")
+        notifications.mark_all_read(self.student)
+        self.assertEqual(self.sync(token)["changes"], [])
+
+        self.login_student()
+        changes = self.changes(self.sync(token))
+        self.assertEqual(changes.pop(("enrollment", enrollment.id)), "upsert")
+        self.assertEqual(set(kind for kind, _ in changes), {"notification"})
+        notification = next(c for c in self.sync(token)["changes"] if c["kind"] == "notification")
+        self.assertTrue(notification["data"]["is_read"])
+
+        self.login_teacher()
+        self.assertIn(("enrollment", enrollment.id), self.changes(self.sync(token)))
+
+    # --- Def `test_paging_and_token_errors`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_paging_and_token_errors(self):
+        self.login_student()
+        token = self.sync()["next"]
+        for index in range(5):
+            notifications.notify(self.student.id, f"Message {index}")
+        seen = []
+        while True:
+            data = sync.changes_since(self.client_request(), token, limit=2)
+            seen.extend(change["id"] for change in data["changes"])
+            token = data["next"]
+            if not data["more"]:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(self.client.get(reverse("sync"), {"since": "bogus"}).status_code, 400)
+        expired = sync.make_token(0, timezone.now() - sync.TOKEN_MAX_AGE - timedelta(hours=1))
+        self.assertEqual(self.client.get(reverse("sync"), {"since": expired}).status_code, 410)
+
+    # --- Def `client_request`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def client_request(self):
+        return self.client.get(reverse("sync")).wsgi_request
+
+    # --- Def `test_compaction_keeps_latest_entry`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_compaction_keeps_latest_entry(self):
+        self.login_student()
+        token = self.sync()["next"]
+        for title in ("A", "B", "C"):
+            self.course.title = title
+            self.course.save()
+        material = CourseMaterial.objects.create(course=self.course, file="course_materials/b.pdf")
+        material_id = material.id
+        material.delete()
+        ChangeLog.objects.filter(kind="course").update(created_at=timezone.now() - timedelta(days=1))
+
+        call_command("compact_changelog", stdout=StringIO())
+        course_entries = ChangeLog.objects.filter(kind="course", object_id=self.course.id)
+        self.assertEqual(course_entries.count(), 1)
+        self.assertEqual(self.changes(self.sync(token)), {
+            ("course", self.course.id): "upsert", ("coursematerial", material_id): "delete",
+        })
+        pruned, _ = sync.compact(timedelta(hours=1))
+        self.assertEqual(pruned, 1)
+
+        with self.assertRaisesMessage(CommandError, "--days must be at least 30"):
+            call_command("compact_changelog", "--days", "7", stdout=StringIO())
+        self.assertTrue(ChangeLog.objects.filter(kind="coursematerial").exists())
+
+# --- Class `ExportTests`: High-level intent
+
+# This class contributes to the domain model or view/controller layer.
+
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+class ExportTests(BaseAPIFixture):
+    """Tests for the streaming CSV / JSON Lines exports."""
+
+    # --- Def `export`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def export(self, kind, fmt, **params):
+        response = self.client.get(reverse("core:export", args=[kind, fmt]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content).decode()
+
+    # --- Def `test_exports_are_scoped_to_the_teacher`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_exports_are_scoped_to_the_teacher(self):
+        other_teacher = User.objects.create_user(username="teacher2", password="pass", role="teacher")
+        other_course = Course.objects.create(title="Elsewhere", description="", teacher=other_teacher)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        Enrollment.objects.create(student=self.other_student, course=other_course)
+        Feedback.objects.create(course=self.course, student=self.student, rating=5, comment='Says "great", twice')
+        StatusUpdate.objects.create(user=self.student, content="Mine")
+        StatusUpdate.objects.create(user=self.other_student, content="Not mine")
+        self.login_teacher()
+
+        rows = list(csv.DictReader(StringIO(self.export("enrollments", "csv"))))
+        self.assertEqual([(row["username"], row["course"]) for row in rows], [("student1", "Intro to Testing")])
+        feedback = [json.loads(line) for line in self.export("feedback", "jsonl").splitlines()]
+        self.assertEqual(feedback[0]["comment"], 'Says "great", twice')
+        self.assertEqual(feedback[0]["rating"], 5)
+        rows = list(csv.DictReader(StringIO(self.export("statusupdates", "csv"))))
+        self.assertEqual([row["content"] for row in rows], ["Mine"])
+        self.assertEqual(self.export("enrollments", "csv", course=other_course.id).splitlines(), [
+            "id,course_id,course,student_id,username,first_name,last_name,enrolled_at,is_blocked",
+        ])
+
+        self.assertEqual(self.client.get(reverse("core:export", args=["users", "csv"])).status_code, 404)
+        self.login_student()
+        self.assertEqual(self.client.get(reverse("core:export", args=["feedback", "csv"])).status_code, 403)
+
+    # --- Def `test_formula_cells_are_exported_as_text`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_formula_cells_are_exported_as_text(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        for content in ("=HYPERLINK(\"http://evil\")", "+1", "-2+3", "@SUM(A1)", "fine = ok"):
+            StatusUpdate.objects.create(user=self.student, content=content)
+        self.login_teacher()
+
+        rows = list(csv.DictReader(StringIO(self.export("statusupdates", "csv"))))
+        self.assertEqual([row["content"] for row in rows], [
+            "'=HYPERLINK(\"http://evil\")", "'+1", "'-2+3", "'@SUM(A1)", "fine = ok",
+        ])
+        self.assertEqual({row["user_id"] for row in rows}, {str(self.student.id)})
+        lines = [json.loads(line) for line in self.export("statusupdates", "jsonl").splitlines()]
+        self.assertEqual(lines[0]["content"], "=HYPERLINK(\"http://evil\")")
+
+    # --- Def `test_gzip_follows_accept_encoding_quality`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_gzip_follows_accept_encoding_quality(self):
+        self.login_teacher()
+        url = reverse("core:export", args=["enrollments", "csv"])
+        for header, gzipped in (
+            ("gzip, deflate, br", True), ("br;q=1.0, gzip;q=0.5", True), ("*", True),
+            ("gzip;q=0", False), ("deflate, gzip; q=0.000", False), ("*, gzip;q=0", False),
+            ("identity", False), ("", False),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING=header)
+                body = b"".join(response.streaming_content)
+                self.assertEqual(response.has_header("Content-Encoding"), gzipped)
+                if not gzipped:
+                    self.assertTrue(body.startswith(b"id,course_id,"))
+
+    # --- Def `test_million_row_export_streams_in_constant_memory`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    @skipIf(resource is None, "needs the resource module")
+    def test_million_row_export_streams_in_constant_memory(self):
+        rows = 1_000_000
+        Enrollment.objects.create(student=self.student, course=self.course)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) "
+                "INSERT INTO core_statusupdate (user_id, content, created_at, updated_at) "
+                "SELECT %s, 'Status update ' || i, '2026-01-01 00:00:00', '2026-01-01 00:00:00' FROM n",
+                [rows, self.student.id],
+            )
+        self.login_teacher()
+        response = self.client.get(reverse("core:export", args=["statusupdates", "csv"]), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        # Peak RSS (KiB on Linux) must not move: loading the rows at once
+        # costs hundreds of MiB.
+        peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        lines = 0
+        for chunk in response.streaming_content:
+            lines += decompressor.decompress(chunk).count(b"\n")
+        growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak_before
+        self.assertEqual(lines, rows + 1)
+        self.assertLess(growth, 32 * 1024)
+
+
+# --- Class `RosterTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class RosterTests(BaseAPIFixture):
+    """Tests for bulk roster imports and bulk blocking."""
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        super().setUp()
+        User.objects.bulk_create([
+            User(username=f"pupil{index}", role="student") for index in range(5)
+        ])
+        Enrollment.objects.create(student=self.student, course=self.course)
+        Job.objects.all().delete()
+
+    # --- Def `upload`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def upload(self, text, course=None):
+        url = reverse("course-import-enrollments", args=[(course or self.course).id])
+        roster = SimpleUploadedFile("roster.csv", text.encode(), content_type="text/csv")
+        return self.client.post(url, {"file": roster}, format="multipart")
+
+    # --- Def `test_import_enrolls_in_batches_with_one_notification`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_import_enrolls_in_batches_with_one_notification(self):
+        roster = "username,is_blocked\n" + "".join(f"pupil{index},\n" for index in range(5))
+        roster += "student1,yes\nteacher1,\nnobody,\n"
+        with CaptureQueriesContext(connection) as queries:
+            result = rosters.import_roster(self.course, StringIO(roster), batch_size=3)
+        self.assertEqual(result, rosters.ImportResult(8, 5, 1, 0, 2, ["nobody", "teacher1"]))
+        self.assertLess(len(queries), 40)
+
+        enrollments = Enrollment.objects.filter(course=self.course)
+        self.assertEqual(enrollments.count(), 6)
+        self.assertTrue(enrollments.get(student=self.student).is_blocked)
+        self.assertEqual(
+            list(Notification.objects.filter(user=self.teacher).values_list("message", flat=True)),
+            ["5 students enrolled on Intro to Testing"],
+        )
+        self.assertFalse(Job.objects.filter(name="notify_teacher_of_enrollment").exists())
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual((stats.enrolled_count, stats.active_count), (6, 5))
+        logged = ChangeLog.objects.filter(kind="enrollment", user=self.teacher).values_list("object_id", flat=True)
+        self.assertEqual(set(logged), set(enrollments.values_list("id", flat=True)))
+
+        again = rosters.import_roster(self.course, StringIO("username\npupil0\nstudent1\n"))
+        self.assertEqual((again.enrolled, again.blocked, again.unblocked), (0, 0, 0))
+        self.assertTrue(enrollments.get(student=self.student).is_blocked)
+
+    # --- Def `test_malformed_line_keeps_the_rows_before_it`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_malformed_line_keeps_the_rows_before_it(self):
+        roster = "username,is_blocked\npupil0,\npupil1,no\npupil2,maybe\npupil3,\n"
+        with self.assertRaisesMessage(rosters.RosterError, "Line 4"):
+            rosters.import_roster(self.course, StringIO(roster), batch_size=10)
+        enrolled = Enrollment.objects.filter(course=self.course, student__username__startswith="pupil")
+        self.assertEqual(sorted(enrolled.values_list("student__username", flat=True)), ["pupil0", "pupil1"])
+        self.assertEqual(
+            list(Notification.objects.filter(user=self.teacher).values_list("message", flat=True)),
+            ["2 students enrolled on Intro to Testing"],
+        )
+
+        self.login_teacher()
+        url = reverse("course-import-enrollments", args=[self.course.id])
+        roster = SimpleUploadedFile("roster.csv", b"username\npupil3\n\xff\n", content_type="text/csv")
+        response = self.client.post(url, {"file": roster}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(enrolled.filter(student__username="pupil3").exists())
+
+    # --- Def `test_import_endpoint_and_command`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_import_endpoint_and_command(self):
+        self.login_teacher()
+        response = self.upload("username\npupil0\npupil1\n")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["enrolled"], 2)
+        self.assertEqual(self.upload("name\npupil2\n").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.upload("username,is_blocked\npupil2,maybe\n").status_code, status.HTTP_400_BAD_REQUEST)
+
+        other_teacher = User.objects.create_user(username="teacher2", password="pass", role="teacher")
+        other_course = Course.objects.create(title="Elsewhere", description="", teacher=other_teacher)
+        self.assertEqual(self.upload("username\npupil3\n", other_course).status_code, status.HTTP_403_FORBIDDEN)
+        self.login_student()
+        self.assertEqual(self.upload("username\npupil3\n").status_code, status.HTTP_403_FORBIDDEN)
+
+        out = StringIO()
+        call_command("import_enrollments", self.course.id, "-", stdin=StringIO("username\npupil3\n"), stdout=out)
+        self.assertIn("enrolled 1", out.getvalue())
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 4)
+
+    # --- Def `test_command_reports_unreadable_rosters`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_command_reports_unreadable_rosters(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as roster:
+            # Past the first block the file is decoded in, or nothing is read.
+            roster.write(b"username\npupil0\n" + b"nobody\n" * 2000 + b"\xff\n")
+        self.addCleanup(os.remove, roster.name)
+        with self.assertRaisesMessage(CommandError, "Rows before it were imported."):
+            call_command("import_enrollments", self.course.id, roster.name, "--batch-size", "10", stdout=StringIO())
+        self.assertTrue(Enrollment.objects.filter(course=self.course, student__username="pupil0").exists())
+
+        with self.assertRaisesMessage(CommandError, "Rows before it were imported."):
+            call_command("import_enrollments", self.course.id, "-", stdin=StringIO("username\n" + "x" * 200_000 + "\n"), stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("import_enrollments", self.course.id, roster.name + ".missing", stdout=StringIO())
+
+    # --- Def `test_bulk_block_and_unblock`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_bulk_block_and_unblock(self):
+        Enrollment.objects.create(student=self.other_student, course=self.course)
+        url = reverse("course-block-enrollments", args=[self.course.id])
+        students = [self.student.id, self.other_student.id]
+        self.login_teacher()
+        token = sync.changes_since(None)["next"]
+
+        response = self.client.post(url, {"students": students, "blocked": True}, format="json")
+        self.assertEqual(response.json(), {"changed": 2})
+        self.assertEqual(CourseStats.objects.get(course=self.course).active_count, 0)
+        self.assertEqual(len(self.client.get(reverse("sync"), {"since": token}).json()["changes"]), 2)
+        response = self.client.post(url, {"students": students, "blocked": True}, format="json")
+        self.assertEqual(response.json(), {"changed": 0})
+        response = self.client.post(url, {"students": [self.student.id], "blocked": False}, format="json")
+        self.assertEqual(response.json(), {"changed": 1})
+        self.assertEqual(CourseStats.objects.get(course=self.course).active_count, 1)
+        self.assertEqual(self.client.post(url, {"students": []}, format="json").status_code, 400)
+
+
+# --- Class `TemporaryMediaMixin`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class TemporaryMediaMixin:
+    """Points MEDIA_ROOT at a fresh directory for each test and logs the teacher in."""
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.login_teacher()
+
+
+# --- Class `BlobStorageTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class BlobStorageTests(TemporaryMediaMixin, BaseAPIFixture):
+    """Tests for the deduplicated material storage and its garbage collector."""
+
+    # --- Def `upload`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def upload(self, name, content):
+        response = self.client.post(
+            reverse("core:add_course_material", args=[self.course.id]),
+            {"file": SimpleUploadedFile(name, content)},
+        )
+        self.assertEqual(response.status_code, 302)
+        return CourseMaterial.objects.latest("pk")
+
+    # --- Def `blob_files`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def blob_files(self):
+        root = os.path.join(storage.material_storage.location, storage.BLOB_PREFIX)
+        return sorted(name for _, _, names in os.walk(root) for name in names)
+
+    # --- Def `test_identical_uploads_share_one_blob`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_identical_uploads_share_one_blob(self):
+        slides = b"%PDF-1.4 week one" * 10000
+        first = self.upload("week1.pdf", slides)
+        second = self.upload("Week 1 (copy).PDF", slides)
+        other = self.upload("week2.pdf", b"%PDF-1.4 week two")
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith("blobs/"))
+        self.assertEqual((first.filename, second.filename), ("week1.pdf", "Week 1 (copy).PDF"))
+        self.assertEqual(len(self.blob_files()), 2)
+        blob = Blob.objects.get(name=first.file.name)
+        self.assertEqual((blob.ref_count, blob.size), (2, len(slides)))
+        with second.file.open("rb") as stored:
+            self.assertEqual(stored.read(), slides)
+        response = self.client.get(reverse("core:course_detail", args=[self.course.id]))
+        self.assertContains(response, "Week 1 (copy).PDF")
+
+        other.file = SimpleUploadedFile("week1-again.pdf", slides)
+        other.save()
+        self.assertEqual(Blob.objects.get(name=first.file.name).ref_count, 3)
+        self.assertEqual(Blob.objects.exclude(name=first.file.name).get().ref_count, 0)
+
+    # --- Def `test_collector_keeps_referenced_and_recent_blobs`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_collector_keeps_referenced_and_recent_blobs(self):
+        first = self.upload("notes.txt", b"shared notes")
+        second = self.upload("notes.txt", b"shared notes")
+        gone = self.upload("old.txt", b"removed later")
+        self.client.get(reverse("core:delete_course_material", args=[self.course.id, gone.id]))
+        self.client.get(reverse("core:delete_course_material", args=[self.course.id, first.id]))
+        stray = os.path.join(storage.material_storage.path(storage.SPOOL_DIR), "abandoned")
+        with open(stray, "wb") as partial:
+            partial.write(b"half an upload")
+
+        self.assertEqual(blobs.collect(), (0, 0))
+        self.assertEqual(len(self.blob_files()), 3)
+        # Drifted counts (e.g. after a bulk delete) are caught by the materials check.
+        Blob.objects.update(ref_count=0)
+        Blob.objects.update(stored_at=timezone.now() - timedelta(days=1))
+        os.utime(stray, (0, 0))
+        out = StringIO()
+        call_command("collect_blobs", "--recount", stdout=out)
+        self.assertIn("Deleted 1 unreferenced blobs and 1 stray files.", out.getvalue())
+        self.assertEqual(list(Blob.objects.values_list("name", "ref_count")), [(second.file.name, 1)])
+        self.assertEqual(self.blob_files(), [second.file.name.split("/")[-1]])
+
+    # --- Def `test_adopting_legacy_files_merges_duplicates`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_adopting_legacy_files_merges_duplicates(self):
+        legacy = os.path.join(storage.material_storage.location, "course_materials")
+        os.makedirs(legacy)
+        for name in ("schema.yaml", "schema_IU4oDd4.yaml"):
+            with open(os.path.join(legacy, name), "wb") as old:
+                old.write(b"openapi: 3.0.0")
+            CourseMaterial.objects.create(course=self.course, file=f"course_materials/{name}")
+
+        self.assertEqual(blobs.adopt_legacy_files(), 2)
+        names = set(CourseMaterial.objects.values_list("file", flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertEqual(Blob.objects.get(name=names.pop()).ref_count, 2)
+        self.assertEqual(os.listdir(legacy), [])
+        self.assertEqual(
+            sorted(CourseMaterial.objects.values_list("name", flat=True)), ["schema.yaml", "schema_IU4oDd4.yaml"],
+        )
+
+
+# --- Class `ChunkedUploadTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class ChunkedUploadTests(TemporaryMediaMixin, BaseAPIFixture):
+    """Tests for resumable, chunked material uploads."""
+
+    # --- Def `start`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def start(self, size, course=None):
+        return self.client.post(reverse("upload-list"), {
+            "course": (course or self.course).id, "filename": "lecture.mp4", "size": size,
+        }, format="json")
+
+    # --- Def `put`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def put(self, upload_id, offset, chunk):
+        url = f'{reverse("upload-detail", args=[upload_id])}?offset={offset}'
+        return self.client.put(url, chunk, content_type="application/octet-stream")
+
+    # --- Def `finalize`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def finalize(self, upload_id, content):
+        return self.client.post(
+            reverse("upload-finalize", args=[upload_id]), {"sha256": hashlib.sha256(content).hexdigest()},
+            format="json",
+        )
+
+    # --- Def `test_upload_resumes_and_creates_material`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_upload_resumes_and_creates_material(self):
+        video = os.urandom(300_000)
+        upload_id = self.start(len(video)).json()["id"]
+        self.assertEqual(self.put(upload_id, 0, video[:100_000]).json()["received"], 100_000)
+
+        # A client that lost track asks for the offset instead of starting over.
+        response = self.put(upload_id, 0, video[:100_000])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.json()["received"], 100_000)
+        received = self.client.get(reverse("upload-detail", args=[upload_id])).json()["received"]
+        self.assertEqual(self.put(upload_id, received, video[received:]).json()["received"], len(video))
+        self.assertEqual(self.put(upload_id, len(video), b"extra").status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.finalize(upload_id, video)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        material = CourseMaterial.objects.get(pk=response.json()["id"])
+        self.assertEqual((material.course, material.filename), (self.course, "lecture.mp4"))
+        with material.file.open("rb") as stored:
+            self.assertEqual(stored.read(), video)
+        self.assertEqual(Blob.objects.get(name=material.file.name).ref_count, 1)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(storage.material_storage.path(uploads.UPLOAD_DIR)), [])
+
+    # --- Def `test_interrupted_chunk_keeps_what_arrived`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_interrupted_chunk_keeps_what_arrived(self):
+        content = os.urandom(50_000)
+        session = UploadSession.objects.get(pk=self.start(len(content)).json()["id"])
+
+        # --- Class `DroppedConnection`: High-level intent
+        # This class contributes to the domain model or view/controller layer.
+        # Outline: responsibilities, key parameters, side-effects, and return semantics.
+        class DroppedConnection:
+            # --- Def `__init__`: High-level intent
+            # This function contributes to the domain model or view/controller layer.
+            # Outline: responsibilities, key parameters, side-effects, and return semantics.
+            def __init__(self, data):
+                self.blocks = [data]
+
+            # --- Def `read`: High-level intent
+            # This function contributes to the domain model or view/controller layer.
+            # Outline: responsibilities, key parameters, side-effects, and return semantics.
+            def read(self, size):
+                if not self.blocks:
+                    raise OSError("connection reset")
+                return self.blocks.pop()
+
+        with self.assertRaises(OSError):
+            uploads.write_chunk(session, 0, DroppedConnection(content[:45_000]), len(content))
+        session.refresh_from_db()
+        self.assertEqual(session.received, 45_000)
+        self.assertEqual(self.put(session.pk, 45_000, content[45_000:]).json()["received"], len(content))
+        self.assertEqual(self.finalize(session.pk, content).status_code, status.HTTP_201_CREATED)
+
+    # --- Def `test_checksum_mismatch_and_access`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_checksum_mismatch_and_access(self):
+        upload_id = self.start(4).json()["id"]
+        self.put(upload_id, 0, b"abcd")
+        self.assertEqual(self.finalize(upload_id, b"abce").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).received, 0)
+        self.assertFalse(CourseMaterial.objects.exists())
+
+        other_teacher = User.objects.create_user(username="teacher2", password="pass", role="teacher")
+        other_course = Course.objects.create(title="Elsewhere", description="", teacher=other_teacher)
+        self.assertEqual(self.start(4, other_course).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(other_teacher)
+        self.assertEqual(self.put(upload_id, 0, b"abcd").status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(None)
+        self.login_student()
+        self.assertEqual(self.start(4).status_code, status.HTTP_403_FORBIDDEN)
+
+    # --- Def `test_stale_uploads_are_purged`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_stale_uploads_are_purged(self):
+        stale = self.start(10).json()["id"]
+        fresh = self.start(10).json()["id"]
+        UploadSession.objects.filter(pk=stale).update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(uploads.purge_stale(), 1)
+        self.assertEqual([str(pk) for pk in UploadSession.objects.values_list("pk", flat=True)], [fresh])
+        self.assertEqual(os.listdir(storage.material_storage.path(uploads.UPLOAD_DIR)), [f"{fresh}.part"])
+
+
+# --- Class `MaterialDownloadTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class MaterialDownloadTests(TemporaryMediaMixin, BaseAPIFixture):
+    """Tests for the access-checked material download view."""
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        super().setUp()
+        self.content = bytes(range(256)) * 40
+        self.client.post(
+            reverse("core:add_course_material", args=[self.course.id]),
+            {"file": SimpleUploadedFile("lecture.mp4", self.content)},
+        )
+        self.url = reverse("core:download_material", args=[CourseMaterial.objects.get().id])
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        self.login_student()
+
+    # --- Def `test_access_follows_enrollment`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_access_follows_enrollment(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["Content-Disposition"], 'inline; filename="lecture.mp4"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("private", response["Cache-Control"])
+
+        self.enrollment.is_blocked = True
+        self.enrollment.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.login_other_student()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    # --- Def `test_ranges_and_conditional_requests`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_ranges_and_conditional_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(b"".join(response.streaming_content), self.content[100:200])
+        tail = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(tail.streaming_content), self.content[-10:])
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.content)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(etag, f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    # --- Def `test_front_end_server_offload`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_front_end_server_offload(self):
+        name = CourseMaterial.objects.get().file.name
+        with self.settings(MATERIAL_SENDFILE="x-accel-redirect"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{name}")
+        self.assertEqual(response.content, b"")
+        with self.settings(MATERIAL_SENDFILE="x-sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], storage.material_storage.path(name))
+
+
+# --- Class `MaterialArchiveTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class MaterialArchiveTests(TemporaryMediaMixin, BaseAPIFixture):
+    """Tests for the streamed "download all" ZIP of a course's materials."""
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        super().setUp()
+        # Manifests of a rolled-back course id would outlive the test that cached them.
+        cache.clear()
+        self.files = [
+            ("notes.txt", b"Week one notes. " * 1000),
+            ("lecture.mp4", os.urandom(200_000)),
+            ("notes.txt", b"Week two notes. " * 1000),
+        ]
+        for name, content in self.files:
+            self.upload(name, content)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.url = reverse("core:download_course_materials", args=[self.course.id])
+
+    # --- Def `upload`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def upload(self, name, content):
+        self.client.post(
+            reverse("core:add_course_material", args=[self.course.id]),
+            {"file": SimpleUploadedFile(name, content)},
+        )
+
+    # --- Def `download`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+    # --- Def `test_archive_holds_every_material`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_archive_holds_every_material(self):
+        self.login_student()
+        archive = self.download()
+        self.assertEqual(archive.namelist(), ["notes.txt", "lecture.mp4", "notes (2).txt"])
+        self.assertIsNone(archive.testzip())
+        for info, (_, content) in zip(archive.infolist(), self.files):
+            self.assertEqual(archive.read(info), content)
+        compression = {info.filename: info.compress_type for info in archive.infolist()}
+        self.assertEqual(compression["lecture.mp4"], zipfile.ZIP_STORED)
+        self.assertEqual(compression["notes.txt"], zipfile.ZIP_DEFLATED)
+
+        self.login_other_student()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    # --- Def `test_manifest_is_cached_until_materials_change`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_manifest_is_cached_until_materials_change(self):
+        self.download()
+        with CaptureQueriesContext(connection) as queries:
+            self.download()
+        self.assertFalse(any("core_coursematerial" in query["sql"] for query in queries))
+
+        # Before the commit, the cached manifest is still the current one.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload("slides.pdf", b"%PDF-1.4 slides")
+            self.assertEqual(self.download().namelist()[-1], "notes (2).txt")
+        self.assertEqual(self.download().namelist()[-1], "slides.pdf")
+        with self.captureOnCommitCallbacks(execute=True):
+            CourseMaterial.objects.get(name="lecture.mp4").delete()
+        self.assertNotIn("lecture.mp4", self.download().namelist())
+
+    # --- Def `test_archive_streams_in_bounded_chunks`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_archive_streams_in_bounded_chunks(self):
+        self.upload("recording.mp4", os.urandom(5 * 1024 * 1024))
+        chunks = archives.stream_zip(archives.course_manifest(self.course.id))
+        sizes = [len(chunk) for chunk in chunks]
+        self.assertGreater(len(sizes), 80)
+        self.assertLess(max(sizes), archives.ZIP_CHUNK_SIZE + 1024)
+
+
+# --- Class `AsgiStreamingTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class AsgiStreamingTests(TemporaryMediaMixin, BaseAPIFixture):
+    """Streamed downloads served through `ASGIHandler`, as under Daphne."""
+
+    # --- Def `setUp`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.files = [os.urandom(1024 * 1024) for _ in range(3)]
+        for number, content in enumerate(self.files):
+            self.client.post(
+                reverse("core:add_course_material", args=[self.course.id]),
+                {"file": SimpleUploadedFile(f"part{number}.bin", content)},
+            )
+
+    # --- Def `asgi_get`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def asgi_get(self, path, on_first_body):
+        """GET `path` as the logged-in client through `ASGIHandler`; returns the status and body."""
+        cookie = f"{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+            "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+            "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+        }
+        messages = []
+
+        # --- Def `receive`: High-level intent
+        # This function contributes to the domain model or view/controller layer.
+        # Outline: responsibilities, key parameters, side-effects, and return semantics.
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        # --- Def `send`: High-level intent
+        # This function contributes to the domain model or view/controller layer.
+        # Outline: responsibilities, key parameters, side-effects, and return semantics.
+        async def send(message):
+            if message.get("body") and not any(sent.get("body") for sent in messages):
+                on_first_body()
+            messages.append(message)
+
+        # The test's connection lives inside its transaction; keep it open.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            async_to_sync(ASGIHandler())(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+        body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+        return messages[0]["status"], body
+
+    # --- Def `test_material_is_read_as_it_is_sent`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_material_is_read_as_it_is_sent(self):
+        reads, read = [], downloads.FileRange.read
+
+        # --- Def `counting_read`: High-level intent
+        # This function contributes to the domain model or view/controller layer.
+        # Outline: responsibilities, key parameters, side-effects, and return semantics.
+        def counting_read(file_range, size=-1):
+            data = read(file_range, size)
+            reads.append(len(data))
+            return data
+
+        read_before_sending = []
+        url = reverse("core:download_material", args=[CourseMaterial.objects.earliest("pk").pk])
+        with mock.patch.object(downloads.FileRange, "read", counting_read):
+            code, body = self.asgi_get(url, lambda: read_before_sending.append(sum(reads)))
+        self.assertEqual(code, 200)
+        self.assertEqual(body, self.files[0])
+        self.assertLessEqual(read_before_sending[0], downloads.ASGI_READ_SIZE)
+
+    # --- Def `test_archive_is_built_as_it_is_sent`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_archive_is_built_as_it_is_sent(self):
+        opened, open_file = [], storage.ContentAddressedStorage.open
+
+        # --- Def `counting_open`: High-level intent
+        # This function contributes to the domain model or view/controller layer.
+        # Outline: responsibilities, key parameters, side-effects, and return semantics.
+        def counting_open(material_storage, name, mode="rb"):
+            opened.append(name)
+            return open_file(material_storage, name, mode)
+
+        opened_before_sending = []
+        url = reverse("core:download_course_materials", args=[self.course.id])
+        with mock.patch.object(storage.ContentAddressedStorage, "open", counting_open):
+            code, body = self.asgi_get(url, lambda: opened_before_sending.append(len(opened)))
+        self.assertEqual(code, 200)
+        archive = zipfile.ZipFile(BytesIO(body))
+        self.assertEqual([archive.read(name) for name in archive.namelist()], self.files)
+        self.assertEqual(opened_before_sending, [1])
+
+
+# --- Def `image_bytes`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def image_bytes(size, color="teal", fmt="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+# --- Class `ThumbnailTests`: High-level intent
+# This class contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+class ThumbnailTests(TemporaryMediaMixin, BaseAPIFixture):
+    """Tests for the background photo thumbnails and material previews."""
+
+    # --- Def `upload`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def upload(self, name, content):
+        self.client.post(
+            reverse("core:add_course_material", args=[self.course.id]),
+            {"file": SimpleUploadedFile(name, content)},
+        )
+        return CourseMaterial.objects.latest("pk")
+
+    # --- Def `queued`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def queued(self):
+        return Job.objects.filter(name="generate_derivatives", status=Job.QUEUED).count()
+
+    # --- Def `test_photo_variants_are_generated_and_chosen_by_size`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_photo_variants_are_generated_and_chosen_by_size(self):
+        self.teacher.photo = SimpleUploadedFile("me.png", image_bytes((500, 400)))
+        self.teacher.save()
+        self.assertEqual(self.queued(), 1)
+        # Logging in saves `last_login` only and queues nothing more.
+        self.login_teacher()
+        self.assertEqual(self.queued(), 1)
+        jobs.run_pending()
+
+        self.teacher.refresh_from_db()
+        variants = self.teacher.photo_variants
+        self.assertEqual(variants["source"], self.teacher.photo.name)
+        self.assertEqual(variants["widths"], [64, 160, 320])
+        kind = thumbnails.KINDS["photo"]
+        for fmt, pillow_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+            name = thumbnails.derivative_name(kind, variants["digest"], 160, fmt)
+            with Image.open(kind.storage.path(name)) as image:
+                self.assertEqual((image.format, image.size), (pillow_format, (160, 160)))
+
+        medium = thumbnails.derivative_name(kind, variants["digest"], 160, "jpeg")
+        response = self.client.get(reverse("core:user_profile", args=[self.teacher.username]))
+        self.assertContains(response, f'src="/media/{medium}"')
+        self.assertContains(response, 'type="image/webp"')
+
+        data = UserSerializer(self.teacher).data
+        self.assertEqual([variant["width"] for variant in data["photo"]], [64, 160, 320])
+        self.assertTrue(data["photo"][0]["webp"].endswith("-64.webp"))
+        plan = get_values_plan(UserSerializer)
+        row = User.objects.filter(pk=self.teacher.pk).values(*plan.lookups).get()
+        self.assertEqual(plan.build(row), data)
+
+    # --- Def `test_material_previews_are_shared_and_access_checked`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_material_previews_are_shared_and_access_checked(self):
+        content = image_bytes((1200, 600), fmt="JPEG")
+        first = self.upload("diagram.jpg", content)
+        second = self.upload("copy.jpg", content)
+        self.upload("notes.txt", b"no preview for text")
+        self.assertEqual(self.queued(), 2)
+        jobs.run_pending()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.previews["widths"], [160, 480])
+        self.assertEqual(first.previews["digest"], second.previews["digest"])
+        root = storage.material_storage.path(thumbnails.KINDS["preview"].prefix)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(root)), 4)
+
+        url = reverse("core:material_preview", args=[first.pk, 480, "webp"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        with Image.open(BytesIO(b"".join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (480, 240))
+        self.assertEqual(self.client.get(reverse("core:material_preview", args=[first.pk, 300, "webp"])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertContains(
+            self.client.get(reverse("core:course_detail", args=[self.course.id])),
+            reverse("core:material_preview", args=[first.pk, 160, "webp"]),
+        )
+        self.login_other_student()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(reverse("course-detail", args=[self.course.id]))
+        previews = response.data["course_materials"][0]["preview"]
+        self.assertEqual([preview["width"] for preview in previews], [160, 480])
+        self.assertTrue(previews[0]["jpeg"].endswith(f"/materials/{first.pk}/previews/160.jpeg"))
+
+    # --- Def `test_replaced_and_unreadable_sources`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def test_replaced_and_unreadable_sources(self):
+        self.student.photo = SimpleUploadedFile("old.png", image_bytes((40, 40), "red"))
+        self.student.save()
+        jobs.run_pending()
+        self.student.refresh_from_db()
+        # Too small for the larger widths, which are never upscaled.
+        self.assertEqual(self.student.photo_variants["widths"], [64])
+        old_digest = self.student.photo_variants["digest"]
+
+        self.student.photo = SimpleUploadedFile("new.png", image_bytes((400, 400), "blue"))
+        self.student.save()
+        self.assertEqual(User.objects.get(pk=self.student.pk).photo_variants, {})
+        self.assertEqual(thumbnails.photo_url(self.student, 64), self.student.photo.url)
+        jobs.run_pending()
+        self.student.refresh_from_db()
+        self.assertNotEqual(self.student.photo_variants["digest"], old_digest)
+
+        # The old photo's thumbnails go once the grace period is over.
+        self.assertEqual(thumbnails.collect(timedelta(0)), 2)
+        self.assertEqual(thumbnails.collect(timedelta(0)), 0)
+
+        broken = self.upload("broken.png", b"not really a png")
+        jobs.run_pending()
+        broken.refresh_from_db()
+        self.assertEqual(broken.previews["widths"], [])
+        self.assertEqual(self.queued(), 0)
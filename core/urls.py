@@ -19,6 +19,7 @@ urlpatterns = [
     # Dashboard and registration views
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('teacher_dashboard/', views.teacher_dashboard_view, name='teacher_dashboard'),
+    path('exports/<str:kind>.<str:fmt>', views.export_view, name='export'),
     path('student_dashboard/', views.student_dashboard_view, name='student_dashboard'),
     path('register/', views.register, name='register'),
     
@@ -29,6 +30,9 @@ urlpatterns = [
 
     path('courses/<int:course_id>/add-material/', views.add_course_material_view, name='add_course_material'),
     path('courses/<int:course_id>/delete-material/<int:material_id>/', views.delete_course_material_view, name='delete_course_material'),
+    path('materials/<int:material_id>/', views.download_material_view, name='download_material'),
+    path('materials/<int:material_id>/previews/<int:width>.<slug:fmt>', views.material_preview_view, name='material_preview'),
+    path('courses/<int:course_id>/materials.zip', views.download_course_materials_view, name='download_course_materials'),
     path('courses/<int:pk>/', views.CourseDetailView.as_view(), name='course_detail'),
     
     # Profile views
@@ -46,6 +50,7 @@ urlpatterns = [
     path('profile/<str:username>/', views.user_profile_view, name='user_profile'),
 
     path('mark-notification-as-read/<int:notification_id>/', views.mark_notification_as_read, name='mark_notification_as_read'),
+    path('notifications/mark-all-read/', views.mark_all_notifications_as_read, name='mark_all_notifications_as_read'),
 
  
 ]
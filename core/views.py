@@ -8,6 +8,8 @@ Notes for the marker/reviewer:
 
 """
 
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
@@ -15,11 +17,20 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.urls import reverse_lazy, reverse
 from django.utils.decorators import method_decorator
 from django.contrib import messages
-from django.db.models import Q 
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import slugify
+from django.views.decorators.http import require_GET, require_POST, require_safe
 
 from .forms import CustomUserCreationForm, CourseForm, FeedbackForm, StatusUpdateForm, ProfileUpdateForm, CourseMaterialForm
-from .models import User, Course, Enrollment, Feedback, StatusUpdate, CourseMaterial, Notification
+from .models import User, Course, Enrollment, Feedback, StatusUpdate, CourseMaterial
 from .decorators import teacher_required, student_required, user_is_owner, teacher_is_course_owner, teacher_is_course_owner_by_id
+from .notifications import mark_all_read, mark_read, recent_unread
+from .pagination import InvalidCursor, paginate_keyset
+from . import archives, catalogue, downloads, exports, identity, search, thumbnails
 
 
 # --- Def `home_view`: High-level intent
@@ -93,13 +104,39 @@ def teacher_dashboard_view(request):
     Display the dashboard for teacher users with their courses and notifications.
     """
     courses = Course.objects.filter(teacher=request.user)
-    notifications = Notification.objects.filter(user=request.user, is_read=False).order_by('-created_at')
+    notifications = recent_unread(request.user)
     context = {
         'courses': courses,
         'notifications': notifications
     }
     return render(request, 'core/teacher_dashboard.html', context)
 
+@login_required
+@teacher_required
+@require_GET
+# --- Def `export_view`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def export_view(request, kind, fmt):
+    """
+    Stream the teacher's enrollments, feedback or students' status updates as
+    CSV or JSON Lines (see core/exports.py), gzipped when the client accepts
+    it. `?course=<id>` limits the export to one course.
+    """
+    if kind not in exports.EXPORTS or fmt not in exports.FORMATS:
+        raise Http404
+    course_id = request.GET.get('course')
+    if course_id is not None and not course_id.isdigit():
+        return HttpResponseBadRequest('Invalid course id')
+    compress = exports.accepts_gzip(request.headers.get('Accept-Encoding', ''))
+    chunks = exports.stream_export(kind, fmt, request.user, course_id and int(course_id), compress=compress)
+    response = StreamingHttpResponse(downloads.streaming_chunks(request, chunks), content_type=exports.FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
 @login_required
 @student_required
 # --- Def `student_dashboard_view`: High-level intent
@@ -108,7 +145,7 @@ def teacher_dashboard_view(request):
 def student_dashboard_view(request):
     enrollments = Enrollment.objects.filter(student=request.user)
     status_updates = StatusUpdate.objects.filter(user=request.user).order_by('-created_at')[:5]
-    notifications = Notification.objects.filter(user=request.user, is_read=False).order_by('-created_at') # New
+    notifications = recent_unread(request.user)
     context = {
         'enrollments': enrollments,
         'status_updates': status_updates,
@@ -126,10 +163,20 @@ def student_dashboard_view(request):
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
     
+@login_required
 def mark_notification_as_read(request, notification_id):
-    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    if not mark_read(request.user, notification_id):
+        raise Http404('No such notification.')
+    return redirect(request.META.get('HTTP_REFERER', '/'))
+
+# --- Def `mark_all_notifications_as_read`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+@login_required
+@require_POST
+def mark_all_notifications_as_read(request):
+    """Mark every notification of the current user read in a single UPDATE."""
+    mark_all_read(request.user)
     return redirect(request.META.get('HTTP_REFERER', '/'))
 
 
@@ -143,9 +190,37 @@ def mark_notification_as_read(request, notification_id):
 
 
 class CourseListView(ListView):
+    """
+    Display the course catalogue, newest first, one keyset page at a time.
+    """
     model = Course
     template_name = 'core/course_list.html'
     context_object_name = 'courses'
+    paginate_by = 24
+    cursor_ordering = ('-created_at', '-id')
+
+    # --- Def `get_queryset`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def get_queryset(self):
+        return super().get_queryset().select_related('teacher', 'stats')
+
+    # --- Def `paginate_queryset`: High-level intent
+    # This function contributes to the domain model or view/controller layer.
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Replace Django's OFFSET paginator with a `(created_at, id)` range seek.
+        Pages are served from the catalogue cache (core/catalogue.py).
+        """
+        try:
+            page, _ = catalogue.read_through(
+                f'html:{self.request.get_full_path()}:{page_size}',
+                lambda: paginate_keyset(queryset, self.cursor_ordering, self.request.GET.get('cursor'), page_size),
+            )
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return None, page, page.object_list, page.has_other_pages()
 
 
 # --- Class `CourseDetailView`: High-level intent
@@ -158,9 +233,44 @@ class CourseListView(ListView):
 
 
 class CourseDetailView(DetailView):
+    """
+    Course page in a fixed number of queries, however many students and
+    feedback entries the course has.
+
+    The viewer's enrollment and feedback state are `Exists` annotations on
+    the course query itself; materials, feedback (with authors) and, for the
+    owning teacher, enrollments (with students) are prefetched once into
+    lists the template iterates.
+    """
     model = Course
     template_name = 'core/course_detail.html'
-    
+
+    # --- Def `get_queryset`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Course.objects.select_related('teacher').prefetch_related(
+            Prefetch('course_materials', to_attr='material_list'),
+            Prefetch('feedback_set', queryset=Feedback.objects.select_related('student'), to_attr='feedback_list'),
+        )
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_enrolled=Exists(Enrollment.objects.filter(course=OuterRef('pk'), student=user)),
+                has_submitted_feedback=Exists(Feedback.objects.filter(course=OuterRef('pk'), student=user)),
+            )
+        if user.is_authenticated and user.role == 'teacher':
+            # Only the owning teacher sees the roster; other teachers get an empty list.
+            queryset = queryset.prefetch_related(Prefetch(
+                'enrollment_set',
+                queryset=Enrollment.objects.filter(course__teacher=user).select_related('student'),
+                to_attr='enrollment_list',
+            ))
+        return queryset
+
     # --- Def `get_context_data`: High-level intent
     
     # This function contributes to the domain model or view/controller layer.
@@ -170,18 +280,12 @@ class CourseDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         course = context['course']
-        user = self.request.user
-        
-        context['course_materials'] = course.course_materials.all()
-        
-        if user.is_authenticated:
-            is_enrolled = course.enrollment_set.filter(student=user).exists()
-            context['is_enrolled'] = is_enrolled
-            
-            if user.role == 'student' and is_enrolled:
-                has_submitted_feedback = Feedback.objects.filter(student=user, course=course).exists()
-                context['has_submitted_feedback'] = has_submitted_feedback
-        
+        context['course_materials'] = course.material_list
+        context['feedbacks'] = course.feedback_list
+        context['enrollments'] = getattr(course, 'enrollment_list', [])
+        if self.request.user.is_authenticated:
+            context['is_enrolled'] = course.is_enrolled
+            context['has_submitted_feedback'] = course.has_submitted_feedback
         return context
 
 @method_decorator(login_required, name='dispatch')
@@ -213,14 +317,14 @@ class CourseCreateView(CreateView):
 # This function contributes to the domain model or view/controller layer.
 # Outline: responsibilities, key parameters, side-effects, and return semantics.
 def add_course_material_view(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
+    course = identity.get_object_or_404(request, Course, pk=course_id)
     if request.method == 'POST':
         form = CourseMaterialForm(request.POST, request.FILES)
         if form.is_valid():
             material = form.save(commit=False)
             material.course = course
             material.save()
-            messages.success(request, f"New material '{material.file.name.split('/')[-1]}' added to course.")
+            messages.success(request, f"New material '{material.filename}' added to course.")
             return redirect('core:course_detail', pk=course.id)
     else:
         form = CourseMaterialForm()
@@ -237,11 +341,68 @@ def delete_course_material_view(request, course_id, material_id):
     Allows a teacher to delete a course material file.
     """
     material = get_object_or_404(CourseMaterial, pk=material_id, course_id=course_id)
-    file_name = material.file.name.split('/')[-1]
+    file_name = material.filename
     material.delete()
     messages.success(request, f"The material '{file_name}' was deleted.")
     return redirect('core:course_detail', pk=course_id)
 
+@login_required
+@require_safe
+# --- Def `download_material_view`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def download_material_view(request, material_id):
+    """
+    Serve a course material to its course's teacher and to students enrolled
+    and not blocked in the course, with byte ranges, conditional requests and
+    optional front-end server offload (see core/downloads.py).
+    """
+    material = get_object_or_404(CourseMaterial.objects.select_related('course'), pk=material_id)
+    if not _may_read_materials(request.user, material.course):
+        raise PermissionDenied
+    return downloads.serve_material(request, material)
+
+@login_required
+@require_safe
+# --- Def `material_preview_view`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def material_preview_view(request, material_id, width, fmt):
+    """Serve a generated preview of a material to those who may read it (see core/thumbnails.py)."""
+    material = get_object_or_404(CourseMaterial.objects.select_related('course'), pk=material_id)
+    if not _may_read_materials(request.user, material.course):
+        raise PermissionDenied
+    variants = thumbnails.current_variants(material.previews, material.file.name)
+    if fmt not in thumbnails.FORMATS or width not in variants.get('widths', ()):
+        raise Http404('This material has no such preview.')
+    name = thumbnails.derivative_name(thumbnails.KINDS['preview'], variants['digest'], width, fmt)
+    filename = f'{os.path.splitext(material.filename)[0]}-{width}.{fmt}'
+    return downloads.serve_file(request, material.file.storage, name, filename)
+
+@login_required
+@require_GET
+# --- Def `download_course_materials_view`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def download_course_materials_view(request, course_id):
+    """Stream every material of a course as one ZIP archive (see core/archives.py)."""
+    course = identity.get_object_or_404(request, Course, pk=course_id)
+    if not _may_read_materials(request.user, course):
+        raise PermissionDenied
+    chunks = archives.stream_zip(archives.course_manifest(course.pk))
+    response = StreamingHttpResponse(downloads.streaming_chunks(request, chunks), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{slugify(course.title) or "course"}-materials.zip"'
+    return response
+
+# --- Def `_may_read_materials`: High-level intent
+# This function contributes to the domain model or view/controller layer.
+# Outline: responsibilities, key parameters, side-effects, and return semantics.
+def _may_read_materials(user, course):
+    """The course's teacher and its enrolled, unblocked students may read its materials."""
+    return user.pk == course.teacher_id or Enrollment.objects.filter(
+        course=course, student=user, is_blocked=False,
+    ).exists()
+
 @method_decorator(login_required, name='dispatch')
 @method_decorator(user_is_owner, name='dispatch')
 # --- Class `ProfileUpdateView`: High-level intent
@@ -259,7 +420,7 @@ class ProfileUpdateView(UpdateView):
     # Outline: responsibilities, key parameters, side-effects, and return semantics.
 
     def get_object(self, queryset=None):
-        return get_object_or_404(User, username=self.kwargs.get('username'))
+        return identity.get_object_or_404(self.request, User, username=self.kwargs.get('username'))
     
     # --- Def `form_valid`: High-level intent
     
@@ -294,6 +455,16 @@ class CourseUpdateView(UpdateView):
     form_class = CourseForm
     template_name = 'core/course_update_form.html'
 
+    # --- Def `get_object`: High-level intent
+
+    # This function contributes to the domain model or view/controller layer.
+
+    # Outline: responsibilities, key parameters, side-effects, and return semantics.
+
+    def get_object(self, queryset=None):
+        # Already loaded by `teacher_is_course_owner`.
+        return identity.get_object_or_404(self.request, Course, pk=self.kwargs['pk'])
+
     # --- Def `form_valid`: High-level intent
 
     # This function contributes to the domain model or view/controller layer.
@@ -327,7 +498,9 @@ def enroll_in_course_view(request, course_id):
     Handle a student's enrollment in a course.
     """
     course = get_object_or_404(Course, id=course_id)
-    enrollment, created = Enrollment.objects.get_or_create(student=request.user, course=course)
+    # Atomic so the course stats (core/signals.py) commit with the enrollment.
+    with transaction.atomic():
+        enrollment, created = Enrollment.objects.get_or_create(student=request.user, course=course)
     
     if created:
         messages.success(request, f'You have successfully enrolled in "{course.title}".')
@@ -353,7 +526,8 @@ def submit_feedback_view(request, course_id):
             feedback = form.save(commit=False)
             feedback.course = course
             feedback.student = request.user
-            feedback.save()
+            with transaction.atomic():
+                feedback.save()
             messages.success(request, 'Thank you! Your feedback has been submitted.')
             return redirect('core:course_detail', pk=course_id)
     else:
@@ -374,7 +548,8 @@ def block_student_view(request, course_id, student_id):
     """
     enrollment = get_object_or_404(Enrollment, course_id=course_id, student_id=student_id)
     enrollment.is_blocked = not enrollment.is_blocked
-    enrollment.save()
+    with transaction.atomic():
+        enrollment.save()
     if enrollment.is_blocked:
         messages.success(request, f'Student "{enrollment.student.username}" has been blocked from the course.')
     else:
@@ -393,7 +568,15 @@ def user_profile_view(request, username):
     Display a user's profile and handle status updates.
     """
     profile_user = get_object_or_404(User, username=username)
-    status_updates = StatusUpdate.objects.filter(user=profile_user).order_by('-created_at')
+    try:
+        status_updates = paginate_keyset(
+            StatusUpdate.objects.filter(user=profile_user),
+            ('-created_at', '-id'),
+            request.GET.get('cursor'),
+            page_size=10,
+        )
+    except InvalidCursor:
+        raise Http404('Invalid cursor')
     
     if request.method == 'POST':
         form = StatusUpdateForm(request.POST)
@@ -422,14 +605,14 @@ def search_users_view(request):
     """
     Handles user search functionality, accessible to all users.
     
-    Searches for users by username or real name based on a 'q' query parameter.
+    Searches for users by username or real name based on a 'q' query parameter,
+    using the full-text index; the 50 best matches are shown in rank order.
     """
     query = request.GET.get('q', '')
     results = []
     
     if query:
-        results = User.objects.filter(
-            Q(username__icontains=query) | Q(first_name__icontains=query) | Q(last_name__icontains=query)
-        ).order_by('username')
+        page = search.search(query, kinds=['user'], page_size=50)
+        results = [hit['object'] for hit in page]
         
     return render(request, 'core/search_users.html', {'query': query, 'results': results})
\ No newline at end of file
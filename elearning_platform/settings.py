@@ -49,6 +49,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.identity.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,6 +83,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Web and `run_workers` processes write concurrently; wait for the
+        # write lock instead of failing with "database is locked".
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -119,6 +123,15 @@ STATIC_ROOT = BASE_DIR / 'staticfiles' # Adicione esta linha
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Course materials are downloaded through core.views.download_material_view,
+# which checks access first. Behind a front-end server, let it send the file:
+# - "x-accel-redirect": nginx; MATERIAL_ACCEL_PREFIX must be an `internal`
+#   location aliasing MEDIA_ROOT.
+# - "x-sendfile": Apache mod_xsendfile or lighttpd.
+# Empty: Django sends the file itself (with sendfile under gunicorn/uWSGI).
+MATERIAL_SENDFILE = os.environ.get('MATERIAL_SENDFILE', '')
+MATERIAL_ACCEL_PREFIX = '/protected-media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -140,16 +153,65 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+
+    # List endpoints are paginated with keyset cursors (see core/pagination.py).
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 25,
     
     # Add this line to register the custom exception handler.
     'EXCEPTION_HANDLER': 'core.utils.custom_exception_handler',}
 
+# Caches
+# - "default": Django's per-process local-memory cache.
+# - "catalogue": course catalogue pages (core/catalogue.py), bounded by
+#   MAX_ENTRIES. Local memory evicts least recently used entries but is private
+#   to each process, so an invalidation only reaches the worker that made the
+#   change. With several workers set CATALOGUE_CACHE=file to share a directory
+#   (CATALOGUE_CACHE_PATH) instead; it culls a third of its files when full.
+CATALOGUE_CACHE_OPTIONS = {'MAX_ENTRIES': int(os.environ.get('CATALOGUE_CACHE_ENTRIES', 1000))}
+if os.environ.get('CATALOGUE_CACHE', 'locmem') == 'file':
+    CATALOGUE_CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CATALOGUE_CACHE_PATH', BASE_DIR / 'cache' / 'catalogue'),
+        'OPTIONS': {**CATALOGUE_CACHE_OPTIONS, 'CULL_FREQUENCY': 3},
+    }
+else:
+    CATALOGUE_CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalogue',
+        'OPTIONS': CATALOGUE_CACHE_OPTIONS,
+    }
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'catalogue': CATALOGUE_CACHE_BACKEND,
+}
+
 # Daphne ASGI application
 ASGI_APPLICATION = 'elearning_platform.asgi.application'
 
 # Channel Layers for real-time chat
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
-}
+# - "memory" (default): single process only; fine for development.
+# - "sqlite": shared SQLite file, so several Daphne workers on one host can
+#   exchange group messages without a Redis service (see chat/layers.py).
+# - "redis": channels-redis, for multi-host deployments.
+CHANNEL_LAYER = os.environ.get('CHANNEL_LAYER', 'memory')
+if CHANNEL_LAYER == 'sqlite':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "chat.layers.SQLiteChannelLayer",
+            "CONFIG": {"path": os.environ.get('CHANNEL_LAYER_PATH', BASE_DIR / 'channels.sqlite3')},
+        },
+    }
+elif CHANNEL_LAYER == 'redis':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0')]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        },
+    }
@@ -31,7 +31,10 @@ from core.api import (
     CourseViewSet,
     EnrollmentViewSet,
     FeedbackViewSet,
-    StatusUpdateViewSet
+    StatusUpdateViewSet,
+    SearchAPIView,
+    SyncAPIView,
+    UploadViewSet,
 )
 
 # Initialize the DRF router.
@@ -43,6 +46,7 @@ router.register(r'courses', CourseViewSet, basename='course')
 router.register(r'enrollments', EnrollmentViewSet, basename='enrollment')
 router.register(r'feedbacks', FeedbackViewSet, basename='feedback')
 router.register(r'statusupdates', StatusUpdateViewSet, basename='statusupdate')
+router.register(r'uploads', UploadViewSet, basename='upload')
 
 
 # Define the main URL patterns for the entire project.
@@ -54,6 +58,12 @@ urlpatterns = [
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
 
+    # Full-text search across users, courses and feedback.
+    path('api/search/', SearchAPIView.as_view(), name='search'),
+
+    # Delta sync for offline clients.
+    path('api/sync/', SyncAPIView.as_view(), name='sync'),
+
     # Include all URLs registered with the DRF router under the /api/ prefix.
     path('api/', include(router.urls)),
 
@@ -65,9 +75,11 @@ urlpatterns = [
 
     # Include all standard (non-API) URLs from the core application. This must be last.
     path('', include('core.urls')),    
- ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+ ]
 
 # This should only be used in a development environment (when DEBUG is True).
+# Only profile photos are public media; course materials go through the
+# access-checked download view (core.views.download_material_view).
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL + 'user_photos/', document_root=settings.MEDIA_ROOT / 'user_photos')